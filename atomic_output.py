@@ -0,0 +1,109 @@
+"""Transakcyjny zapis plików wyjściowych i stanu.
+
+``write_atomic()`` zapisuje do unikalnego pliku tymczasowego w tym samym
+katalogu, robi fsync i podmienia plik przez ``os.replace`` (potem fsync
+katalogu), więc po awarii plik jest albo stary, albo nowy — nigdy urwany.
+Gdy treść jest identyczna z obecną (porównanie rozmiaru i SHA-256), plik nie
+jest w ogóle dotykany: nie zmienia się mtime ani ``git diff``.
+
+``locked()`` to blokada doradcza (flock na ``<plik>.lock``) na czas całej
+transakcji odczyt stanu -> zapis kalendarza -> zapis stanu; nakładające się
+przebiegi (cron, scheduler, procesy render_pool) czekają na siebie. W obrębie
+procesu blokada jest wielowejściowa, więc zagnieżdżone ``locked()`` tego samego
+pliku nie zakleszczają się.
+"""
+
+import fcntl, hashlib, os, tempfile, threading
+from contextlib import contextmanager
+
+import metrics
+
+# Odczyt umask wymaga jej ustawienia — robimy to raz, zanim wystartują wątki
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_registry_lock = threading.Lock()
+_locks = {}   # ścieżka -> RLock (wątki tego procesu)
+_depth = {}   # ścieżka -> zagnieżdżenie; zmieniane tylko przez wątek trzymający RLock
+
+@contextmanager
+def locked(path):
+    """Wyłączny dostęp do ``path`` między procesami i wątkami"""
+    key = os.path.abspath(path)
+    with _registry_lock:
+        rlock = _locks.setdefault(key, threading.RLock())
+    with rlock:
+        if key in _depth:
+            _depth[key] += 1
+            try:
+                yield
+            finally:
+                _depth[key] -= 1
+            return
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        with open(f"{key}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            _depth[key] = 1
+            try:
+                yield
+            finally:
+                del _depth[key]
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def same_content(path, data):
+    """Czy plik ma dokładnie tę treść (najpierw tani test rozmiaru)"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return False
+    return digest.digest() == hashlib.sha256(data).digest()
+
+def fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def target_mode(path):
+    """Uprawnienia obecnego pliku, a dla nowego — jak z open() (0666 bez umask)"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+def write_atomic(path, data, mode=None):
+    """Zapisuje ``data`` (str w UTF-8 albo bytes) do ``path``; False gdy treść się nie zmieniła
+
+    mkstemp tworzy plik 0600, więc bez ``mode`` plik dostaje uprawnienia
+    poprzedniej wersji (kalendarz serwowany przez WWW musi być czytelny).
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if same_content(path, data):
+        metrics.incr("writes_skipped")
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, target_mode(path) if mode is None else mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    fsync_dir(directory)
+    metrics.incr("bytes_written", len(data))
+    return True
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Tryb wsadowy: wiele drużyn z wielu lig w jednym przebiegu.
+
+Każda grupa rozgrywkowa (endpoint ``plays/<group>/matches``) jest pobierana
+dokładnie raz (wszystkie grupy równolegle), a kalendarze wszystkich drużyn z tej grupy powstają ze wspólnego
+indeksu meczów po nazwie drużyny. Zmienione kalendarze wszystkich grup są
+renderowane razem w puli procesów (render_pool). Duże przebiegi
+(``TABLE_MIN_FIXTURES`` meczów) filtrują i liczą kolumny przez fixture_table.
+"""
+
+import json, os, sys
+
+import metrics
+from atomic_output import locked, write_atomic
+from fixture_table import FixtureTable, use_table
+from render_pool import render_calendars
+from scrape_to_ics import (
+    GROUP, NOT_MODIFIED, compute_hash, fetch_matches_many, fixtures_for_teams,
+    group_from_url, index_matches_by_team, match_to_fixture,
+)
+
+BATCH_STATE_FILE = os.environ.get("BATCH_STATE_FILE", ".batch_state.json")
+
+def load_batch_config(path):
+    """Wczytuje konfigurację i zwraca listę wpisów {team, group, output}"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    entries = []
+    for i, item in enumerate(config.get("teams", [])):
+        team = item.get("team")
+        output = item.get("output")
+        group = item.get("group") or (group_from_url(item["url"]) if item.get("url") else GROUP)
+        if not team or not output or not group:
+            raise ValueError(f"{path}: teams[{i}] needs 'team', 'output' and 'group' (or 'url')")
+        entries.append({"team": team, "group": group, "output": output})
+    return entries
+
+def group_entries(entries):
+    """Grupuje wpisy po grupie rozgrywkowej, zachowując kolejność z pliku"""
+    by_group = {}
+    for entry in entries:
+        by_group.setdefault(entry["group"], []).append(entry)
+    return by_group
+
+def load_state(path=BATCH_STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state, path=BATCH_STATE_FILE):
+    write_atomic(path, json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True))
+
+def team_fixtures(matches, teams, columnar=False):
+    """{drużyna: (mecze, kolumny albo None)} dla drużyn jednej grupy"""
+    if columnar:
+        table = FixtureTable.from_fixtures([f for f in map(match_to_fixture, matches) if f])
+        return {team: table.for_team_with_columns(team) for team in teams}
+    by_team = fixtures_for_teams(index_matches_by_team(matches), teams)
+    return {team: (fixtures, None) for team, fixtures in by_team.items()}
+
+def record_validator(state, out, validator):
+    """Walidator listy meczów, z której powstał kalendarz ``out`` (zapisywany razem ze stanem)"""
+    validators = state.setdefault("validators", {})
+    if validator:
+        validators[out] = validator
+    else:
+        validators.pop(out, None)
+
+def plan_group(group, team_entries, matches, state, columnar=None, validator=None):
+    """Kalendarze grupy do przerenderowania: [(team, out, fixtures, hash, columns)]
+
+    ``columnar`` — filtr i kolumny z fixture_table; domyślnie gdy grupa jest duża.
+    ``validator`` — walidator ``matches``; stan z nim jest zapisywany dopiero po
+    wyrenderowaniu kalendarzy, więc nieudany przebieg go nie zapamięta.
+    """
+    if matches is NOT_MODIFIED:
+        print(f"NO_CHANGE group {group} ({len(team_entries)} teams)")
+        return []
+    if not matches:
+        # Nie nadpisuj kalendarzy pustą listą przy błędzie API
+        print(f"WARNING: no matches for group {group}, skipping {len(team_entries)} teams")
+        return []
+
+    if columnar is None:
+        columnar = use_table(len(matches))
+    jobs = []
+    with metrics.stage("filter", columnar=columnar):
+        by_team = team_fixtures(matches, [entry["team"] for entry in team_entries], columnar)
+    for entry in team_entries:
+        team, out = entry["team"], entry["output"]
+        fixtures, columns = by_team[team]
+        if not fixtures:
+            print(f"WARNING: {team} not found in group {group}")
+            continue
+
+        record_validator(state, out, validator)
+        h = compute_hash(fixtures)
+        if state.get(out) == h and os.path.exists(out):
+            print(f"NO_CHANGE {out}")
+            continue
+        jobs.append((team, out, fixtures, h, columns))
+    return jobs
+
+def render_jobs(jobs, state):
+    """Renderuje zaplanowane kalendarze (w puli procesów, gdy jest ich dużo); zwraca liczbę"""
+    if not jobs:
+        return 0
+    with metrics.stage("render", calendars=len(jobs)):
+        results = render_calendars([(team, out, fixtures, columns) for team, out, fixtures, _, columns in jobs])
+    for (team, out, fixtures, h, _), (_, added, changed, removed) in zip(jobs, results):
+        state[out] = h
+        print(f"{out}: {added} added, {changed} changed, {removed} removed")
+        print(f"UPDATED {out} ({len(fixtures)} fixtures for {team})")
+    return len(jobs)
+
+def update_group(group, team_entries, matches, state, validator=None):
+    """Aktualizuje kalendarze drużyn jednej grupy; zwraca liczbę zmienionych"""
+    return render_jobs(plan_group(group, team_entries, matches, state, validator=validator), state)
+
+def group_seen(team_entries, state):
+    """Walidator listy meczów, z której powstały wszystkie istniejące kalendarze grupy, albo None
+
+    Tylko wtedy lista z tym samym walidatorem (304) niczego w grupie nie zmieni.
+    """
+    validators = state.get("validators", {})
+    seen = {validators.get(e["output"]) if e["output"] in state and os.path.exists(e["output"]) else None
+            for e in team_entries}
+    return seen.pop() if len(seen) == 1 else None
+
+def seen_for(by_group, state, groups=None):
+    """{grupa: walidator} dla grup, których kalendarze powstały z jednej wersji listy"""
+    seen = {}
+    for group in groups if groups is not None else by_group:
+        validator = group_seen(by_group[group], state)
+        if validator:
+            seen[group] = validator
+    return seen
+
+def run_batch(config_path, state_path=BATCH_STATE_FILE):
+    entries = load_batch_config(config_path)
+    by_group = group_entries(entries)
+    print(f"Batch: {len(entries)} teams in {len(by_group)} competition groups")
+
+    # Nakładające się przebiegi (cron, scheduler) czekają, zamiast nadpisywać sobie stan
+    with locked(state_path):
+        state = load_state(state_path)
+        # Grupy z listą w tej samej wersji co przy ostatnim zapisie kalendarzy -> NOT_MODIFIED
+        validators = {}
+        matches_by_group = fetch_matches_many(list(by_group), seen_for(by_group, state), validators)
+        # Kalendarze wszystkich grup renderowane razem, żeby pula procesów miała pełne paczki;
+        # o trybie kolumnowym decyduje rozmiar całego przebiegu, nie pojedynczej grupy
+        total = sum(len(m) for m in matches_by_group.values() if m and m is not NOT_MODIFIED)
+        jobs = []
+        for group, team_entries in by_group.items():
+            jobs += plan_group(group, team_entries, matches_by_group[group], state, use_table(total),
+                               validators.get(group))
+        updated = render_jobs(jobs, state)
+
+        save_state(state, state_path)
+    print(f"Batch done: {updated} calendars updated")
+    return updated
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"usage: {sys.argv[0]} CONFIG")
+    run_batch(sys.argv[1])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Mierzy koszt przeglądarki na stronę: nowy Chrome za każdym razem vs pula browser_pool.
+
+Dla każdej strony (domyślnie FIXTURES_URL) czeka na pierwszą datę meczu
+w HTML, tak jak renderowanie w sources.py. Podaje czas na stronę
+i liczbę startów Chrome. Wymaga Chrome.
+Użycie: python bench_browser.py [strony] [rozmiar puli]
+"""
+
+import re, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+import browser_pool, metrics
+from scrape_to_ics import URL
+
+DATE_RE = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+
+def wait_for_dates(driver, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not DATE_RE.search(driver.page_source):
+        time.sleep(0.25)
+
+def fresh_browser(url):
+    driver = browser_pool.launch_browser()
+    try:
+        driver.get(url)
+        wait_for_dates(driver)
+    finally:
+        driver.quit()
+
+def pooled(pool, url):
+    with pool.lease() as driver:
+        driver.get(url)
+        wait_for_dates(driver)
+
+def run(label, fn, pages, workers):
+    metrics.reset()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(lambda _: fn(URL), range(pages)))
+    elapsed = time.perf_counter() - t0
+    launches = metrics.snapshot()["counters"].get("browser_launches", 0)
+    print(f"{label:14s} {elapsed:7.2f}s  {elapsed / pages:6.2f}s/page  {launches:3d} Chrome launches")
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    run("fresh browser", fresh_browser, pages, size)
+    pool = browser_pool.BrowserPool(size=size)
+    try:
+        run(f"pool (size {size})", lambda url: pooled(pool, url), pages, size)
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    main()
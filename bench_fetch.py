@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Porównuje czas pobierania N lig: sekwencyjne requests.get vs http_fetch.fetch_all.
+
+Uruchamia lokalny serwer-zaślepkę, który odpowiada na każde żądanie po DELAY s.
+fetch_all jest mierzone z produkcyjnymi limitami (FETCH_WORKERS, FETCH_PER_HOST)
+i bez limitu na host (po jednym wątku i połączeniu na ligę).
+"""
+
+import json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import http_fetch
+
+DELAY = 0.2
+LEAGUES = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        body = json.dumps([{"host": {"name": "A"}, "guest": {"name": "B"},
+                            "dateTime": "2025-11-15T13:00:00"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def timed_fetch(urls, max_workers, per_host):
+    """Czas fetch_all przy podanych limitach; sesja i semafory hostów budowane od nowa"""
+    http_fetch.MAX_PER_HOST = per_host
+    http_fetch._session = None
+    http_fetch._host_limits.clear()
+    t0 = time.perf_counter()
+    responses = http_fetch.fetch_all(urls, max_workers=max_workers)
+    elapsed = time.perf_counter() - t0
+    assert all(r is not None and r.status_code == 200 for r in responses.values())
+    return elapsed
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/plays/group-{i}/matches" for i in range(LEAGUES)]
+
+    t0 = time.perf_counter()
+    for url in urls:
+        requests.get(url, timeout=30)
+    sequential = time.perf_counter() - t0
+
+    workers, per_host = http_fetch.MAX_WORKERS, http_fetch.MAX_PER_HOST
+    production = timed_fetch(urls, workers, per_host)
+    uncapped = timed_fetch(urls, LEAGUES, LEAGUES)
+
+    server.shutdown()
+    print(f"{LEAGUES} leagues, one request = {DELAY * 1000:.0f} ms")
+    print(f"sequential requests.get: {sequential * 1000:.0f} ms")
+    print(f"http_fetch.fetch_all:    {production * 1000:.0f} ms ({sequential / production:.1f}x)"
+          f" — {workers} workers, {per_host} per host")
+    print(f"  without per-host cap:  {uncapped * 1000:.0f} ms ({sequential / uncapped:.1f}x)"
+          f" — {LEAGUES} workers, {LEAGUES} per host")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Mierzy parser HTML meczów na wielomegabajtowych stronach: dawny regex vs html_fixtures.
+
+Strona testowa to powielony selenium_debug.html z wplecionymi wierszami meczów
+i tekstem z myślnikami bez dat. Dawny wzorzec jest mierzony osobno: na samych
+wierszach meczów (tu radzi sobie dobrze) i na początku prawdziwej strony, gdzie
+długie węzły tekstowe bez nowych linii uruchamiają jego kwadratowe nawroty.
+Przed pomiarem sprawdza podział par z dywizami w nazwach klubów.
+Użycie: python bench_html.py [rozmiary w MB...]
+"""
+
+import re, sys, time
+
+from html_fixtures import iter_fixtures, iter_text_chunks
+
+BASE_PAGE = "selenium_debug.html"
+LEGACY_MAX_MB = 1
+# Dawny wzorzec potrzebuje kilkunastu sekund już na kilku KB prawdziwej strony
+LEGACY_REAL_BYTES = 2048
+LEGACY_RE = re.compile(
+    r"(?P<home>[^<>\n–-]{3,}?)\s*[–-]\s*(?P<away>[^<>\n]{3,}?)"
+    r".{0,200}?"
+    r"(?P<date>\d{2}\.\d{2}\.\d{4})"
+    r"(?:\s*,\s*(?P<time>\d{2}:\d{2}))?",
+    re.S
+)
+
+def read_base():
+    with open(BASE_PAGE, encoding="utf-8") as f:
+        return f.read()
+
+def build_page(megabytes, base=""):
+    """Wiersze meczów do zadanego rozmiaru; co 2000 wierszy wstawia ``base``"""
+    parts, size, i = [], 0, 0
+    while size < megabytes * 1024 * 1024:
+        block = (f'<div class="match"><span>Klub {i} – KS Wasilków</span>'
+                 f'<span class="date">{i % 28 + 1:02d}.10.2025, 15:00</span></div>\n'
+                 f'<p>Informacje - komunikaty - regulaminy - sezon {i}</p>\n')
+        if base and i % 2000 == 0:
+            block += base
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "".join(parts), i
+
+# Wiersze z dywizami w nazwach klubów -> oczekiwana para (home, away)
+PAIR_CASES = [
+    ("Bruk-Bet Termalica Nieciecza – KS Wasilków", ("Bruk-Bet Termalica Nieciecza", "KS Wasilków")),
+    ("KS Wasilków – Bruk-Bet Termalica Nieciecza", ("KS Wasilków", "Bruk-Bet Termalica Nieciecza")),
+    ("Bruk-Bet Termalica Nieciecza - KS Wasilków", ("Bruk-Bet Termalica Nieciecza", "KS Wasilków")),
+    ("Olimpia Zambrów-KS Wasilków", ("Olimpia Zambrów", "KS Wasilków")),
+]
+
+def check_pairs():
+    for line, expected in PAIR_CASES:
+        page = f"<div>{line}</div><span>04.10.2025, 15:00</span>"
+        found = [(f["home"], f["away"]) for f in iter_fixtures([page])]
+        assert found == [expected], (line, found)
+    print(f"pairs: OK ({len(PAIR_CASES)} hyphenated club names)")
+
+def legacy(page):
+    return sum(1 for _ in LEGACY_RE.finditer(page))
+
+def streaming(page):
+    return sum(1 for _ in iter_fixtures(iter_text_chunks(page)))
+
+def timed(fn, page):
+    t0 = time.perf_counter()
+    found = fn(page)
+    return time.perf_counter() - t0, found
+
+def main():
+    sizes = [float(a) for a in sys.argv[1:]] or [0.5, 1, 4, 16]
+    check_pairs()
+    base = read_base()
+
+    prefix = base[:LEGACY_REAL_BYTES]
+    old_time, _ = timed(legacy, prefix)
+    new_time, _ = timed(streaming, prefix)
+    print(f"{BASE_PAGE} first {LEGACY_REAL_BYTES} B: legacy regex {old_time:6.2f}s, html_fixtures {new_time:6.4f}s")
+
+    for mb in sizes:
+        page, rows = build_page(mb, base)
+        new_time, found = timed(streaming, page)
+        line = (f"{len(page) / 1024 / 1024:6.1f} MB, {rows} rows: html_fixtures {new_time:6.2f}s "
+                f"({found} found, {len(page) / new_time / 1024 / 1024:.1f} MB/s)")
+        if mb <= LEGACY_MAX_MB:
+            rows_only, _ = build_page(mb)
+            old_time, old_found = timed(legacy, rows_only)
+            new_time, new_found = timed(streaming, rows_only)
+            line += (f"; rows only: legacy regex {old_time:6.2f}s ({old_found} found), "
+                     f"html_fixtures {new_time:6.2f}s ({new_found} found)")
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Sprawdza ics_writer względem pliku wzorcowego i build_ics oraz mierzy wydajność obu.
+
+Użycie: python bench_ics.py [liczby meczów...] [--update-golden]
+"""
+
+import io, json, random, sys, time, tracemalloc
+from datetime import date, timedelta
+
+from ics import Calendar
+
+import ics_writer
+from scrape_to_ics import build_ics
+
+TEAM = "KS Wasilków"
+SAMPLE = "bench_data/sample_fixtures.json"
+GOLDEN = "bench_data/golden_calendar.ics"
+
+def synthetic_fixtures(n, team=TEAM, seed=0):
+    rng = random.Random(seed)
+    start = date(2025, 8, 1)
+    fixtures = []
+    for i in range(n):
+        opponent = f"Klub Sportowy {i % 997:03d}"
+        home, away = (team, opponent) if i % 2 else (opponent, team)
+        # Jeden sezon (~300 dni), niezależnie od liczby meczów
+        day = start + timedelta(days=rng.randrange(300))
+        time_s = None if rng.random() < 0.1 else f"{rng.choice([11, 13, 15, 17, 19])}:{rng.choice(['00', '30'])}"
+        fixtures.append({"id": f"syn-{i}", "home": home, "away": away,
+                         "date": day.strftime("%d.%m.%Y"), "time": time_s,
+                         "stadium": f"Stadion {i % 50}", "state": "Scheduled", "queue": i % 34 + 1})
+    return fixtures
+
+def writer_output(fixtures):
+    return "".join(ics_writer.iter_calendar(fixtures, TEAM))
+
+def event_facts(calendar_text):
+    """Znormalizowany opis wydarzeń — porównywalny między oboma serializerami"""
+    facts = []
+    for ev in Calendar(calendar_text).events:
+        trigger = ev.alarms[0].trigger if ev.alarms else None
+        facts.append((ev.uid, ev.name, ev.description, ev.begin.date() if ev.all_day else ev.begin.to("UTC"),
+                      None if ev.all_day else ev.duration, ev.all_day, trigger))
+    return sorted(facts, key=lambda f: f[0])
+
+def check_golden(update):
+    with open(SAMPLE, encoding="utf-8") as f:
+        sample = json.load(f)
+    out = writer_output(sample)
+    if update:
+        with open(GOLDEN, "w", encoding="utf-8", newline="") as f:
+            f.write(out)
+        print(f"Updated {GOLDEN}")
+    with open(GOLDEN, encoding="utf-8", newline="") as f:
+        assert out == f.read(), f"ics_writer output differs from {GOLDEN}"
+    # Limit 75 oktetów (nie znaków) — próbka ma nazwy z wielobajtowymi znakami
+    too_long = [line for line in out.split("\r\n") if len(line.encode("utf-8")) > 75]
+    assert not too_long, f"lines over 75 octets: {too_long[:3]}"
+    assert all(len(line.encode("utf-8")) <= 75 for line in ics_writer.fold("SUMMARY:" + "–" * 29).split("\r\n"))
+    reference = "".join(build_ics(sample, TEAM).serialize_iter())
+    assert event_facts(out) == event_facts(reference), "ics_writer and build_ics disagree"
+    print(f"golden: OK ({len(sample)} events, matches {GOLDEN} and build_ics)")
+
+def measure(fn, fixtures):
+    # Czas i pamięć w osobnych przebiegach — tracemalloc mocno spowalnia kod
+    t0 = time.perf_counter()
+    fn(fixtures)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(fixtures)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(fixtures) / elapsed, peak
+
+def via_ics_py(fixtures):
+    buf = io.StringIO()
+    buf.writelines(build_ics(fixtures, TEAM).serialize_iter())
+
+def via_writer(fixtures):
+    ics_writer.write_calendar_stream(fixtures, io.StringIO(), TEAM)
+
+def main():
+    args = sys.argv[1:]
+    update = "--update-golden" in args
+    sizes = [int(a) for a in args if a.isdigit()] or [100, 1000, 10000]
+    check_golden(update)
+    for n in sizes:
+        fixtures = synthetic_fixtures(n)
+        for name, fn in (("ics.py build_ics", via_ics_py), ("ics_writer", via_writer)):
+            rate, peak = measure(fn, fixtures)
+            print(f"{n:>7} events  {name:17s} {rate:>10,.0f} events/s  peak {peak / 1024 / 1024:7.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Porównuje pobranie dużej listy meczów: response.json() + indeks vs parsowanie strumieniowe.
+
+Uruchamia lokalny serwer-zaślepkę z syntetyczną listą N meczów (ligi
+z wieloma drużynami) i mierzy czas oraz szczytową pamięć (tracemalloc)
+dla scrape_fixtures_with_api(stream=False) i stream=True.
+Użycie: python bench_json.py [liczby meczów...]
+"""
+
+import json, os, sys, tempfile, threading, time, tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TEAM = "KS Wasilków"
+BODY = b""
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        view = memoryview(BODY)
+        for i in range(0, len(view), 64 * 1024):
+            self.wfile.write(view[i:i + 64 * 1024])
+
+    def log_message(self, *args):
+        pass
+
+def synthetic_body(n):
+    """Lista meczów w kształcie comp-api; drużyna TEAM gra co 40. mecz"""
+    matches = []
+    for i in range(n):
+        host = TEAM if i % 40 == 0 else f"Klub Sportowy {i % 997:03d}"
+        matches.append({
+            "id": f"syn-{i}", "queue": i % 34 + 1, "state": "Scheduled",
+            "dateTime": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T15:00:00",
+            "stadium": f"Stadion {i % 50}, ul. Sportowa {i % 90}",
+            "host": {"id": f"h-{i}", "name": host, "logo": f"https://example.invalid/{i}.png"},
+            "guest": {"id": f"g-{i}", "name": f"Klub Sportowy {(i + 1) % 997:03d}",
+                      "logo": f"https://example.invalid/{i + 1}.png"},
+            "result": None, "referees": [{"name": f"Sędzia {i % 300}", "role": "main"}],
+        })
+    return json.dumps(matches, ensure_ascii=False).encode("utf-8")
+
+def measure(scrape, stream):
+    t0 = time.perf_counter()
+    fixtures = scrape(team=TEAM, stream=stream)
+    elapsed = time.perf_counter() - t0
+    # Czas i pamięć w osobnych przebiegach — tracemalloc mocno spowalnia kod
+    tracemalloc.start()
+    scrape(team=TEAM, stream=stream)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, fixtures
+
+def main():
+    global BODY
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["HTTP_CACHE_DIR"] = tempfile.mkdtemp()
+    os.environ["COMPETITION_GROUP"] = "bench-group"
+    from scrape_to_ics import scrape_fixtures_with_api as scrape
+
+    sizes = [int(a) for a in sys.argv[1:]] or [10000, 100000]
+    results = []
+    for n in sizes:
+        BODY = synthetic_body(n)
+        full = measure(scrape, False)
+        streamed = measure(scrape, True)
+        assert full[2] == streamed[2], "streaming and response.json() disagree"
+        results.append((n, len(BODY), full, streamed))
+
+    for n, size, full, streamed in results:
+        print(f"{n} matches ({size / 1024 / 1024:.1f} MB, {len(full[2])} for {TEAM}): "
+              f"response.json() {full[0]:.2f}s peak {full[1] / 1024 / 1024:.1f} MB, "
+              f"streaming {streamed[0]:.2f}s peak {streamed[1] / 1024 / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
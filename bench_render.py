@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Mierzy skalowanie render_pool: te same kalendarze renderowane przez 1..N procesów.
+
+Każdy przebieg pisze do świeżego katalogu tymczasowego (pełne renderowanie,
+bez łatania). Podaje kalendarze/s, przyspieszenie względem jednego procesu
+i sprawdza, że wyniki są identyczne.
+Użycie: python bench_render.py [drużyny] [mecze na drużynę] [procesy...]
+"""
+
+import hashlib, os, shutil, sys, tempfile, time
+from datetime import datetime, timezone
+
+from bench_ics import synthetic_fixtures
+from render_pool import render_calendars
+
+# Stały DTSTAMP, żeby przebiegi z różną liczbą procesów dały identyczne pliki
+NOW = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+def jobs_for(teams, per_team, out_dir):
+    jobs = []
+    for i in range(teams):
+        team = f"Klub Sportowy {i:04d}"
+        jobs.append((team, os.path.join(out_dir, f"team_{i:04d}.ics"), synthetic_fixtures(per_team, team=team, seed=i)))
+    return jobs
+
+def digest(out_dir):
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(".ics"):
+            with open(os.path.join(out_dir, name), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+def main():
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    per_team = int(sys.argv[2]) if len(sys.argv) > 2 else 34
+    cpus = os.cpu_count() or 1
+    counts = [int(a) for a in sys.argv[3:]] or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))) or [1]
+    print(f"{teams} calendars x {per_team} fixtures, {cpus} CPUs")
+
+    base_rate, base_digest = None, None
+    for workers in counts:
+        out_dir = tempfile.mkdtemp(prefix="bench_render_")
+        try:
+            jobs = jobs_for(teams, per_team, out_dir)
+            t0 = time.perf_counter()
+            render_calendars(jobs, workers=workers, now=NOW)
+            elapsed = time.perf_counter() - t0
+            d = digest(out_dir)
+        finally:
+            shutil.rmtree(out_dir)
+        rate = teams / elapsed
+        base_rate = base_rate or rate
+        base_digest = base_digest or d
+        # Ścieżki są w nazwach plików, nie w treści — treść musi być identyczna
+        assert d == base_digest, f"{workers} workers produced different calendars"
+        speedup = rate / base_rate
+        print(f"{workers:3d} workers: {elapsed:7.2f}s  {rate:8.0f} calendars/s  "
+              f"speedup {speedup:4.2f}x  efficiency {speedup / workers:4.0%}")
+
+if __name__ == "__main__":
+    main()
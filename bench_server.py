@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test obciążeniowy ics_server: wiele wątków-klientów na lokalnym serwerze.
+
+Indeks meczów jest syntetyczny (bench_ics.synthetic_fixtures w kształcie
+odpowiedzi API), więc test nie wymaga sieci. Mierzy req/s i opóźnienia dla
+pełnych odpowiedzi (gzip), odpowiedzi 304 (If-None-Match) i mieszanki
+drużyn/filtrów, oraz sprawdza nagłówki ETag/Content-Encoding.
+Użycie: python bench_server.py [żądania na scenariusz] [wątki]
+"""
+
+import gzip, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_ics import TEAM, synthetic_fixtures
+from ics_server import FixtureIndex, make_server
+
+TEAMS = 50
+
+def api_matches(n):
+    """Syntetyczne mecze przerobione na format comp-api (host/guest/dateTime)"""
+    matches = []
+    for f in synthetic_fixtures(n):
+        d, m, y = f["date"].split(".")
+        hhmm = f["time"] or "00:00"
+        matches.append({"id": f["id"], "host": {"name": f["home"]}, "guest": {"name": f["away"]},
+                        "dateTime": f"{y}-{m}-{d}T{hhmm}:00", "stadium": f["stadium"],
+                        "state": f["state"], "queue": f["queue"]})
+    return matches
+
+def run(base, paths, requests_total, workers, headers=None):
+    local = threading.local()
+    latencies = []
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        t0 = time.perf_counter()
+        r = session.get(base + paths[i % len(paths)], headers=headers or {}, timeout=10)
+        r.content
+        latencies.append(time.perf_counter() - t0)
+        return r.status_code
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(one, range(requests_total)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return requests_total / elapsed, p50, p99, {s: statuses.count(s) for s in set(statuses)}
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    matches = api_matches(2000)
+    index = FixtureIndex(["bench"], fetch=lambda groups, seen=None, validators=None: {g: matches for g in groups})
+    index.refresh()
+    server = make_server(index, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    path = f"/teams/{TEAM}.ics"
+
+    r = requests.get(base + path, timeout=10)
+    assert r.headers["Content-Encoding"] == "gzip" and r.headers["ETag"].endswith('.gz"')
+    assert r.text.startswith("BEGIN:VCALENDAR")
+    raw = requests.get(base + path, headers={"Accept-Encoding": "identity"}, timeout=10)
+    assert "Content-Encoding" not in raw.headers and raw.headers["ETag"] != r.headers["ETag"]
+    assert gzip.decompress(requests.get(base + path, stream=True, timeout=10).raw.read()) == raw.content
+    print(f"{TEAM}: {len(raw.content)} B, gzip {int(r.headers['Content-Length'])} B")
+
+    mixed = [f"/teams/Klub Sportowy {i:03d}.ics?venue={'DOM' if i % 2 else 'WYJAZD'}&from=2025-09-01&to=2026-03-31"
+             for i in range(TEAMS)]
+    scenarios = [
+        ("200 gzip, one team", [path], None),
+        ("304 If-None-Match", [path], {"If-None-Match": r.headers["ETag"]}),
+        (f"200 gzip, {TEAMS} teams + filters", mixed, None),
+    ]
+    for name, paths, headers in scenarios:
+        rps, p50, p99, statuses = run(base, paths, total, workers, headers)
+        print(f"{name:32s} {rps:8.0f} req/s  p50 {p50:5.1f} ms  p99 {p99:5.1f} ms  {statuses}")
+    cache = server.RequestHandlerClass.cache
+    print(f"render cache: {cache.hits} hits, {cache.misses} misses, {len(cache.entries)} entries")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
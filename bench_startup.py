@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Mierzy zimny start scrape_to_ics przez ``python -X importtime``.
+
+Porównuje obecny import (selenium, ics i requests ładowane przy pierwszym użyciu)
+z importem, który dociąga je od razu — tak jak robił to moduł wcześniej.
+Podaje medianę łącznego czasu importu, najcięższe moduły i czas ``--help``.
+Użycie: python bench_startup.py [powtórzenia]
+"""
+
+import statistics, subprocess, sys, time
+
+SCENARIOS = {
+    "lazy (scrape_to_ics)": "import scrape_to_ics",
+    "eager (+selenium, ics, requests)": "import scrape_to_ics, selenium.webdriver, "
+                                        "selenium.webdriver.chrome.options, ics, http_fetch",
+}
+
+def importtime(code):
+    """{moduł najwyższego poziomu: łączny czas w µs} z wyjścia -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Wcięcie oznacza import zagnieżdżony — liczymy tylko najwyższy poziom
+        if not name.startswith("  "):
+            totals[name.strip()] = int(cumulative)
+    return totals
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Wszystko, co importuje sam interpreter (site, .pth) przed ``-c``, odejmujemy
+    baseline = importtime("pass")
+    results = {}
+    for name, code in SCENARIOS.items():
+        samples, last = [], {}
+        for _ in range(runs):
+            last = {m: t for m, t in importtime(code).items() if m not in baseline}
+            samples.append(sum(last.values()))
+        results[name] = statistics.median(samples)
+        heaviest = sorted(last.items(), key=lambda kv: -kv[1])[:4]
+        print(f"{name:34s} {results[name] / 1000:7.1f} ms  "
+              + ", ".join(f"{m} {t / 1000:.1f}" for m, t in heaviest))
+    lazy, eager = results.values()
+    print(f"import drop: {(eager - lazy) / 1000:.1f} ms ({eager / lazy:.1f}x)")
+
+    probe = subprocess.run([sys.executable, "-c",
+                            "import sys, scrape_to_ics; print(sorted(m for m in ('selenium', 'ics', 'requests') if m in sys.modules))"],
+                           capture_output=True, text=True, check=True)
+    print(f"heavy modules loaded by import: {probe.stdout.strip()}")
+
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "scrape_to_ics.py", "--help"], capture_output=True, check=True)
+        samples.append(time.perf_counter() - t0)
+    print(f"python scrape_to_ics.py --help: {statistics.median(samples) * 1000:.0f} ms (process wall time)")
+
+if __name__ == "__main__":
+    main()
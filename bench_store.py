@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Mierzy fixture_store na archiwum wielu sezonów i grup.
+
+Wczytuje syntetyczne grupy (po ~240 meczów) do świeżej bazy, potem dokłada
+drugą wersję części meczów i mierzy zapytania: bieżące mecze drużyny, stan
+z przeszłości i zmiany od chwili — w porównaniu z przejrzeniem całego
+archiwum w Pythonie (dotychczasowy sposób: lista meczów + filtr po nazwie).
+Użycie: python bench_store.py [sezony] [grupy na sezon]
+"""
+
+import os, sys, tempfile, time
+
+from bench_suite import TEAM, synthetic_matches
+from fixture_store import FixtureStore
+from scrape_to_ics import fixtures_for_team, index_matches_by_team, match_to_fixture
+
+def timed(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def main():
+    seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    groups = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    archive = {f"s{s}-g{g}": synthetic_matches(240, seed=s * 1000 + g) for s in range(seasons) for g in range(groups)}
+    total = sum(len(m) for m in archive.values())
+    print(f"{len(archive)} groups, {total} matches")
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureStore(os.path.join(tmp, "f.sqlite")) as store:
+        t0 = time.perf_counter()
+        for group, matches in archive.items():
+            store.ingest(group, [f for f in map(match_to_fixture, matches) if f], now=1.0)
+        elapsed = time.perf_counter() - t0
+        print(f"ingest:        {elapsed:7.2f}s  {total / elapsed:10,.0f} matches/s")
+
+        # Druga wersja: co dziesiąty mecz przełożony o godzinę
+        t0 = time.perf_counter()
+        for group, matches in archive.items():
+            fixtures = [f for f in map(match_to_fixture, matches) if f]
+            for f in fixtures[::10]:
+                f["time"] = "20:00"
+            store.ingest(group, fixtures, now=2.0)
+        print(f"re-ingest:     {time.perf_counter() - t0:7.2f}s  {store.stats()['versions']} versions")
+
+        latest = [g for g in archive if g.startswith(f"s{seasons - 1}-")]
+        for label, fn in [
+            ("current/team", lambda: store.fixtures(TEAM)),
+            ("current/season", lambda: store.fixtures(TEAM, competitions=latest)),
+            ("as_of/team", lambda: store.fixtures(TEAM, as_of=1.5)),
+            ("changes/team", lambda: store.changes(TEAM, since=1.5)),
+            ("scan/team", lambda: [f for m in archive.values() for f in fixtures_for_team(index_matches_by_team(m), TEAM)]),
+        ]:
+            seconds, rows = timed(fn, repeat=3 if label.startswith("scan") else 20)
+            print(f"{label:14s} {seconds * 1000:8.2f} ms  {len(rows)} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Offline'owy zestaw benchmarków potoku z porównaniem do zapisanych wyników.
+
+Odtwarza nagrane dane (``bench_data/recorded_matches.json`` w kształcie odpowiedzi
+comp-api, ``bench_data/recorded_page.html``, ``debug.html``, ``selenium_debug.html``)
+i generuje syntetyczne sezony od 10² do 10⁶ meczów. Dla każdego przypadku mierzy
+przepustowość (mecze/s) i szczytową pamięć (tracemalloc), a wynik porównuje
+z ``bench_data/baselines.json``: spadek przepustowości o więcej niż
+``RATE_TOLERANCE`` albo wzrost pamięci o więcej niż ``PEAK_TOLERANCE`` to regresja
+(kod wyjścia 1). Wyniki zależą od maszyny — baseline zapisuje się lokalnie.
+
+Użycie: python bench_suite.py [rozmiary...] [--cases a,b] [--update-baseline]
+"""
+
+import argparse, contextlib, io, json, os, random, sys, time, tracemalloc, warnings
+from datetime import date, timedelta
+
+from ics_writer import write_calendar_stream
+from json_stream import iter_matches
+from scrape_to_ics import (
+    build_ics, compute_hash, filter_streamed, fixtures_for_team,
+    index_matches_by_team, match_to_fixture, parse_fixture_rows,
+)
+
+TEAM = "KS Wasilków"
+BASELINE_FILE = "bench_data/baselines.json"
+RECORDED_MATCHES = "bench_data/recorded_matches.json"
+RECORDED_PAGES = ["bench_data/recorded_page.html", "debug.html", "selenium_debug.html"]
+RATE_TOLERANCE = float(os.environ.get("BENCH_RATE_TOLERANCE", "0.25"))
+PEAK_TOLERANCE = float(os.environ.get("BENCH_PEAK_TOLERANCE", "0.20"))
+# Różnice pamięci poniżej tego progu to szum alokatora, nie regresja
+PEAK_SLACK = 256 * 1024
+# Pojedyncza runda trwa co najmniej tyle (małe przypadki są powtarzane); liczy się najlepsza runda
+MIN_SECONDS = 0.2
+ROUNDS = 5
+
+# ics.py ostrzega przy każdej serializacji o zmianie API w 0.9
+warnings.filterwarnings("ignore", category=FutureWarning, module="ics")
+
+def synthetic_matches(n, team=TEAM, seed=0):
+    """Sezon n meczów w kształcie comp-api; liga ma ~√(2n) drużyn, ``team`` jest jedną z nich"""
+    rng = random.Random(seed)
+    size = max(4, round((2 * n) ** 0.5))
+    clubs = [team] + [f"Klub Sportowy {i:04d}" for i in range(1, size)]
+    start = date(2025, 8, 1)
+    matches = []
+    for i in range(n):
+        host = clubs[i % size]
+        guest = clubs[(i // size + 1 + i) % size]
+        if guest == host:
+            guest = clubs[(i + 1) % size]
+        day = start + timedelta(days=rng.randrange(300))
+        hhmm = "00:00" if rng.random() < 0.1 else f"{rng.choice([11, 13, 15, 17, 19])}:{rng.choice(['00', '30'])}"
+        matches.append({
+            "id": f"syn-{i}", "queue": i // (size // 2) + 1,
+            "state": "Unscheduled" if hhmm == "00:00" else "Scheduled",
+            "dateTime": f"{day.isoformat()}T{hhmm}:00", "stadium": f"Stadion {i % 50}",
+            "host": {"id": f"club-{i % size}", "name": host},
+            "guest": {"id": f"club-{(i // size + 1 + i) % size}", "name": guest},
+            "result": None, "referees": [],
+        })
+    return matches
+
+def render_html(fixtures):
+    """Strona w układzie recorded_page.html z podanymi meczami"""
+    rows = []
+    for f in fixtures:
+        when = f"{f['date']}, {f['time']}" if f["time"] else f["date"]
+        rows.append(f'<div class="match-row"><div class="match-row__teams">{f["home"]} – {f["away"]}</div>'
+                    f'<div class="match-row__meta"><span>{f["stadium"]}</span>'
+                    f'<span class="match-row__date">{when}</span></div></div>\n')
+    return ('<!doctype html><html><head><meta charset="utf-8"><title>Terminarz</title></head>'
+            f'<body><nav>Aktualności - Rozgrywki - Kluby</nav><main>{"".join(rows)}</main></body></html>')
+
+class Dataset:
+    """Dane wejściowe jednego rozmiaru, liczone leniwie i współdzielone przez przypadki"""
+
+    def __init__(self, name, matches=None, html=None):
+        self.name = name
+        self._matches = matches
+        self._html = html
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def matches(self):
+        return self._matches
+
+    @property
+    def body(self):
+        return self._get("body", lambda: json.dumps(self.matches, ensure_ascii=False).encode("utf-8"))
+
+    @property
+    def fixtures(self):
+        return self._get("fixtures", lambda: [f for f in map(match_to_fixture, self.matches) if f])
+
+    @property
+    def team_fixtures(self):
+        return self._get("team_fixtures", lambda: fixtures_for_team(index_matches_by_team(self.matches), TEAM))
+
+    @property
+    def html(self):
+        return self._html if self._html is not None else self._get("html", lambda: render_html(self.fixtures))
+
+def chunks_of(body, size=64 * 1024):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+# nazwa -> (największy rozmiar albo None, wejście z Dataset, funkcja, liczba jednostek)
+CASES = {
+    "api_decode": (None, lambda d: d.body, json.loads, lambda d: len(d.matches)),
+    "api_convert": (None, lambda d: d.matches,
+                    lambda m: fixtures_for_team(index_matches_by_team(m), TEAM), lambda d: len(d.matches)),
+    "api_stream": (None, lambda d: d.body,
+                   lambda b: filter_streamed(iter_matches(chunks_of(b)), TEAM), lambda d: len(d.matches)),
+    "parse_fixture_rows": (None, lambda d: d.html,
+                           lambda h: parse_fixture_rows(h, TEAM), lambda d: len(d.matches)),
+    "compute_hash": (None, lambda d: d.fixtures, compute_hash, lambda d: len(d.fixtures)),
+    # ics.py buduje obiekt na każdy mecz — powyżej 10⁴ meczów pomiar trwa minutami
+    "build_ics": (10 ** 4, lambda d: d.team_fixtures,
+                  lambda f: "".join(build_ics(f, TEAM).serialize_iter()), lambda d: len(d.team_fixtures)),
+    "ics_writer": (None, lambda d: d.team_fixtures,
+                   lambda f: write_calendar_stream(f, io.StringIO(), TEAM), lambda d: len(d.team_fixtures)),
+}
+HTML_CASES = {"parse_fixture_rows"}
+
+def measure(fn, arg, units):
+    """(jednostki/s, szczytowa pamięć w B); czas i pamięć w osobnych przebiegach"""
+    best = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ROUNDS):
+            runs, t0 = 0, time.perf_counter()
+            while True:
+                fn(arg)
+                runs += 1
+                elapsed = time.perf_counter() - t0
+                if elapsed >= MIN_SECONDS:
+                    break
+            best = max(best, units * runs / elapsed)
+        tracemalloc.start()
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+def calibrate():
+    """Przepustowość stałego obciążenia referencyjnego (best of ROUNDS)
+
+    Wyniki są skalowane stosunkiem kalibracji z baseline do bieżącej, więc
+    wolniejsza albo obciążona maszyna nie daje od razu fałszywych regresji.
+    """
+    payload = [{"id": i, "name": f"Klub {i}", "date": "01.10.2025"} for i in range(2000)]
+
+    def workload(data):
+        json.loads(json.dumps(data))
+        sorted(data, key=lambda d: (d["date"], d["name"]))
+    return measure(workload, payload, len(payload))[0]
+
+def compare(result, baseline):
+    """Lista opisów regresji względem baseline (pusta gdy OK albo brak baseline)"""
+    if not baseline:
+        return []
+    problems = []
+    if result["rate"] < baseline["rate"] * (1 - RATE_TOLERANCE):
+        problems.append(f"rate {result['rate'] / baseline['rate']:.2f}x")
+    if result["peak"] > baseline["peak"] * (1 + PEAK_TOLERANCE) and result["peak"] - baseline["peak"] > PEAK_SLACK:
+        problems.append(f"peak {result['peak'] / max(baseline['peak'], 1):.2f}x")
+    return problems
+
+def load_baselines(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_baselines(baselines, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def datasets(sizes):
+    with open(RECORDED_MATCHES, encoding="utf-8") as f:
+        recorded = json.load(f)
+    yield Dataset("recorded", matches=recorded)
+    for path in RECORDED_PAGES:
+        with open(path, encoding="utf-8") as f:
+            yield Dataset(f"page:{os.path.basename(path)}", html=f.read())
+    for n in sizes:
+        yield Dataset(str(n), matches=synthetic_matches(n))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=[100, 1000, 10000],
+                        help="rozmiary syntetycznych sezonów (np. 100 10000 1000000)")
+    parser.add_argument("--cases", help=f"przypadki rozdzielone przecinkami ({','.join(CASES)})")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="zapisuje obecne wyniki jako baseline")
+    args = parser.parse_args(argv)
+    cases = args.cases.split(",") if args.cases else list(CASES)
+
+    baselines = load_baselines(args.baseline)
+    calibration = calibrate()
+    scale = baselines.get("_calibration", calibration) / calibration
+    print(f"calibration: {calibration:,.0f} items/s (results scaled by {scale:.2f})")
+    regressions = 0
+    for data in datasets(args.sizes):
+        for name in cases:
+            max_n, prepare, fn, units = CASES[name]
+            html_only = data.matches is None
+            if html_only and name not in HTML_CASES:
+                continue
+            if max_n and not html_only and len(data.matches) > max_n:
+                continue
+            # Strony bez meczów liczymy w MB/s, a nie w meczach
+            count = len(data.html.encode("utf-8")) / 1024 / 1024 if html_only else units(data)
+            rate, peak = measure(fn, prepare(data), count)
+            key = f"{name}/{data.name}"
+            problems = compare({"rate": rate * scale, "peak": peak}, baselines.get(key))
+            if problems:
+                # Potwierdź drugim pomiarem, zanim zgłosisz regresję (szum współdzielonych maszyn)
+                again, peak = measure(fn, prepare(data), count)
+                rate = max(rate, again)
+                problems = compare({"rate": rate * scale, "peak": peak}, baselines.get(key))
+            rate *= scale
+            regressions += bool(problems)
+            status = "REGRESSION " + ", ".join(problems) if problems else ("ok" if key in baselines else "new")
+            if args.update_baseline:
+                baselines[key] = {"rate": round(rate, 1), "peak": peak}
+            shown = f"{rate:>12,.1f} MB/s   " if html_only else f"{rate:>12,.0f} items/s"
+            print(f"{key:38s} {shown} peak {peak / 1024 / 1024:8.2f} MiB  {status}")
+
+    if args.update_baseline:
+        baselines["_calibration"] = round(calibration, 1)
+        save_baselines(baselines, args.baseline)
+        print(f"Baselines saved to {args.baseline}")
+        return 0
+    print(f"{regressions} regression(s)" if regressions else "no regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
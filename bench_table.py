@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Porównuje fixture_table (NumPy) z funkcjami per wiersz na syntetycznym sezonie.
+
+Użycie: python bench_table.py [liczba meczów]
+"""
+
+import sys, time
+
+from bench_ics import TEAM, synthetic_fixtures
+from fixture_table import FixtureTable
+from scrape_to_ics import ALARM_TIME, is_home, monday_alarm_for, to_dt, TZ
+from datetime import datetime
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+def per_row(fixtures):
+    starts, offsets, homes = [], [], []
+    for f in fixtures:
+        dt = to_dt(f["date"], f["time"])
+        if not f["time"]:
+            dt = datetime.combine(dt, datetime.min.time()).replace(tzinfo=TZ)
+        starts.append(int(dt.timestamp()))
+        offsets.append(int((monday_alarm_for(dt, ALARM_TIME) - dt).total_seconds()))
+        homes.append(is_home(f, TEAM))
+    return starts, offsets, homes
+
+def columnar(fixtures):
+    table = FixtureTable.from_fixtures(fixtures, keep_extra=False)
+    return table.start_epoch(), table.alarm_offsets(), table.home_mask(TEAM)
+
+def main():
+    fixtures = synthetic_fixtures(N)
+    t0 = time.perf_counter()
+    expected = per_row(fixtures)
+    row_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = columnar(fixtures)
+    col_time = time.perf_counter() - t0
+    for name, a, b in zip(("start", "alarm offset", "home flag"), expected, got):
+        assert list(a) == b.tolist(), f"{name} mismatch"
+    print(f"{N} fixtures: per-row {row_time:.2f}s, columnar {col_time:.2f}s ({row_time / col_time:.1f}x), results equal")
+
+if __name__ == "__main__":
+    main()
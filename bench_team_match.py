@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Porównuje filtrowanie meczów po drużynie: skan z podciągiem vs indeks team_match.
+
+Liga syntetyczna z drużynami rezerw ("II"); drużyny są szukane w zapisie bez
+polskich znaków i bez prefiksu klubu. Dla wielu szukanych drużyn naraz mierzy:
+- dotychczasowy skan: ``team.lower() in (home + " " + away).lower()`` po każdym meczu,
+- indeks: ``index_matches_by_team`` raz + ``fixtures_for_teams`` (TeamIndex raz na grupę),
+oraz ile meczów każda metoda znalazła, pominęła i przypisała złej drużynie (rezerwom).
+Użycie: python bench_team_match.py [mecze] [szukane drużyny]
+"""
+
+import sys, time
+
+from bench_suite import synthetic_matches
+from scrape_to_ics import fixtures_for_teams, index_matches_by_team, match_to_fixture
+from team_match import fold
+
+def league(n):
+    """Mecze, w których część klubów wystawia też rezerwy ("... II")"""
+    matches = synthetic_matches(n)
+    for i, match in enumerate(matches):
+        for side in ("host", "guest"):
+            name = match[side]["name"]
+            if name.endswith(("3", "6", "9")) and i % 2:
+                match[side]["name"] = name + " II"
+    return matches
+
+def scan(matches, teams):
+    found = {}
+    for team in teams:
+        key = team.lower()
+        fixtures = []
+        for match in matches:
+            if key in (match["host"]["name"] + " " + match["guest"]["name"]).lower():
+                fixture = match_to_fixture(match)
+                if fixture:
+                    fixtures.append(fixture)
+        found[team] = fixtures
+    return found
+
+def indexed(matches, teams):
+    return fixtures_for_teams(index_matches_by_team(matches), teams)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    targets = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    matches = league(n)
+    names = sorted({m[side]["name"] for m in matches for side in ("host", "guest")})
+    first_teams = [name for name in names if not name.endswith(" II")][:targets]
+    # Szukamy pisowni bez prefiksu i bez znaków diakrytycznych — jak wpisuje ją człowiek
+    wanted = {fold(name).replace("klub sportowy ", "").replace("ks ", ""): name for name in first_teams}
+    teams = list(wanted)
+    expected = sum(1 for m in matches for name in first_teams if name in (m["host"]["name"], m["guest"]["name"]))
+    print(f"{n} matches, {len(names)} team names, {len(teams)} target teams, {expected} expected fixtures")
+
+    for label, fn in (("substring scan", scan), ("team index", indexed)):
+        t0 = time.perf_counter()
+        found = fn(matches, teams)
+        elapsed = time.perf_counter() - t0
+        right = sum(1 for team, fs in found.items() for f in fs if wanted[team] in (f["home"], f["away"]))
+        wrong = sum(len(fs) for fs in found.values()) - right
+        print(f"{label:15s} {elapsed:7.2f}s  {right:8d} found  {expected - right:7d} missed  {wrong:7d} wrong team")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Mierzy czas do uzyskania tokenu: dawna ścieżka (sleep 3 s + pełny log) vs przechwycenie CDP.
+
+Wymaga Chrome i dostępu do laczynaspilka.pl. Użycie: python bench_token.py [powtórzenia]
+"""
+
+import json, statistics, sys, time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+import scrape_to_ics
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+def legacy_token():
+    # Odtworzenie ścieżki sprzed przechwytywania nagłówka przez CDP
+    chrome_options = Options()
+    for arg in ("--headless", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"):
+        chrome_options.add_argument(arg)
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.get(scrape_to_ics.URL)
+        time.sleep(3)
+        token = scrape_to_ics.token_from_storage(driver)
+        for log in driver.get_log("performance"):
+            json.loads(log["message"])
+        return token
+    finally:
+        driver.quit()
+
+def measure(fn):
+    times, tokens = [], 0
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        tokens += bool(fn())
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), tokens
+
+def main():
+    for name, fn in (("legacy (sleep + log scan)", legacy_token),
+                     ("CDP header capture", scrape_to_ics.get_auth_token_from_browser)):
+        median, tokens = measure(fn)
+        print(f"{name:28s} median {median:.2f}s, token found {tokens}/{RUNS}")
+
+if __name__ == "__main__":
+    main()
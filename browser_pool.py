@@ -0,0 +1,167 @@
+"""Pula długo żyjących przeglądarek headless dla tokenu i renderowania stron.
+
+Start Chrome to sekunda albo więcej i setki MB pamięci, więc przechwytywanie
+tokenu i renderowanie stron rozgrywek wypożyczają przeglądarkę z puli zamiast
+uruchamiać własną::
+
+    with browser_pool.lease() as driver:
+        driver.get(url)
+
+Pula ma najwyżej ``BROWSER_POOL_SIZE`` przeglądarek (kolejne wypożyczenia czekają
+do ``BROWSER_LEASE_TIMEOUT``). Przed wydaniem przeglądarka przechodzi szybki test
+zdrowia; niezdrowa, taka, przy której użyciu poleciał wyjątek, albo użyta
+``BROWSER_MAX_USES`` razy jest zamykana i zastępowana nową (wycieki pamięci
+długo żyjących kart). Po zwrocie przeglądarka wraca na ``about:blank``
+bez ciasteczek, a zaległy log sieciowy jest odrzucany.
+"""
+
+import atexit, os, threading, time
+from contextlib import contextmanager
+
+import metrics
+
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_USES = int(os.environ.get("BROWSER_MAX_USES", "50"))
+BROWSER_LEASE_TIMEOUT = float(os.environ.get("BROWSER_LEASE_TIMEOUT", "60"))
+
+class PoolTimeout(Exception):
+    """Żadna przeglądarka nie zwolniła się w czasie BROWSER_LEASE_TIMEOUT"""
+
+def launch_browser():
+    """Nowy Chrome z opcjami z browser_options() i blokadą zbędnych zasobów"""
+    from selenium import webdriver
+    from scrape_to_ics import BLOCKED_RESOURCES, browser_options
+    metrics.incr("browser_launches")
+    driver = webdriver.Chrome(options=browser_options())
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+    return driver
+
+def healthy(driver):
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+def quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Error closing browser: {e}")
+
+def reset(driver):
+    """Czyści stan po wypożyczeniu; False gdy przeglądarka nie nadaje się do dalszego użycia"""
+    try:
+        # Token z poprzedniej wizyty nie może wrócić przez token_from_storage
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.get("about:blank")
+        driver.delete_all_cookies()
+        driver.get_log("performance")
+        return True
+    except Exception:
+        return False
+
+class BrowserPool:
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, factory=launch_browser):
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory
+        self.idle = []      # [(driver, liczba użyć)]
+        self.created = 0    # przeglądarki żywe: bezczynne + wypożyczone
+        self.cond = threading.Condition()
+        self.closed = False
+
+    def _acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                if self.closed:
+                    raise RuntimeError("browser pool is closed")
+                if self.idle:
+                    return self.idle.pop()
+                if self.created < self.size:
+                    self.created += 1
+                    return None, 0
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no browser free within {timeout:g}s")
+                self.cond.wait(remaining)
+
+    def _discard(self, driver):
+        if driver is not None:
+            quit_quietly(driver)
+        with self.cond:
+            self.created -= 1
+            self.cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=BROWSER_LEASE_TIMEOUT):
+        """Wypożycza zdrową przeglądarkę na czas bloku ``with``"""
+        driver, uses = self._acquire(timeout)
+        if driver is not None and not healthy(driver):
+            metrics.incr("browser_unhealthy")
+            quit_quietly(driver)
+            driver = None
+        if driver is None:
+            try:
+                driver, uses = self.factory(), 0
+            except BaseException:
+                self._discard(None)
+                raise
+        metrics.incr("browser_leases")
+        ok = False
+        try:
+            yield driver
+            ok = True
+        finally:
+            uses += 1
+            if ok and uses < self.max_uses and reset(driver):
+                with self.cond:
+                    if self.closed:
+                        ok = False
+                    else:
+                        self.idle.append((driver, uses))
+                        self.cond.notify()
+                if not ok:
+                    self._discard(driver)
+            else:
+                metrics.incr("browser_recycles")
+                self._discard(driver)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.created -= len(idle)
+            self.cond.notify_all()
+        for driver, _ in idle:
+            quit_quietly(driver)
+
+_pool = {"pool": None}
+_pool_lock = threading.Lock()
+
+def default_pool():
+    """Pula współdzielona przez cały proces (zamykana przy wyjściu)"""
+    with _pool_lock:
+        if _pool["pool"] is None:
+            _pool["pool"] = BrowserPool()
+            atexit.register(_pool["pool"].close)
+        return _pool["pool"]
+
+def lease(timeout=BROWSER_LEASE_TIMEOUT):
+    return default_pool().lease(timeout)
+
+def render_page(url, ready, timeout=30.0, poll=0.5):
+    """Ładuje ``url`` w przeglądarce z puli i zwraca pierwszy prawdziwy wynik ``ready(html)``
+
+    Strony rozgrywek dociągają treść skryptami, więc zamiast stałego
+    oczekiwania sprawdzamy HTML co ``poll`` sekund; None po ``timeout``.
+    """
+    with lease() as driver:
+        driver.get(url)
+        deadline = time.monotonic() + timeout
+        while True:
+            result = ready(driver.page_source)
+            if result or time.monotonic() >= deadline:
+                return result or None
+            time.sleep(poll)
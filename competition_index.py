@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Indeks rozgrywek comp-api w SQLite: sezony -> grupy lig -> ligi -> grupy -> drużyny.
+
+Crawler schodzi po hierarchii poziomami; węzły jednego poziomu są pobierane
+porcjami po ``CRAWL_SLICE`` przez http_fetch (pula połączeń, limit równoległych
+żądań na host), a każda porcja jest zatwierdzana, zanim pobierzemy następną —
+w pamięci są naraz tylko jej odpowiedzi. Dla każdego węzła zapisujemy walidatory (ETag/Last-Modified) i hash treści,
+więc kolejny crawl pyta warunkowo i przepisuje dzieci tylko tam, gdzie lista się
+zmieniła. Do dzieci schodzimy, gdy lista rodzica się zmieniła; pozostałe węzły
+(także listy meczów grup, z których biorą się nazwy drużyn) są sprawdzane
+warunkowo, gdy od ostatniego sprawdzenia minęło ``CRAWL_RECHECK_AGE`` sekund,
+a przy ``full=True`` — wszystkie.
+
+Z indeksu ``groups_for_team()`` zwraca grupy drużyny w najnowszym sezonie —
+wtedy samo ``TEAM_NAME`` wystarcza, bez ręcznie kopiowanego ``FIXTURES_URL``.
+
+Ścieżki poziomów (względem ``API_BASE``) można nadpisać zmiennymi ``CRAWL_*_PATH``.
+Użycie: ``python competition_index.py crawl [--season ID] [--full] | find DRUŻYNA | stats``
+"""
+
+import hashlib, json, os, sqlite3, sys, time
+from contextlib import closing
+
+from scrape_to_ics import API_BASE, api_get_many, matches_url
+from team_match import index_for
+
+COMPETITION_INDEX = os.environ.get("COMPETITION_INDEX", ".competitions.sqlite")
+# (rodzaj węzła, ścieżka listy jego dzieci); dzieci są węzłami kolejnego poziomu
+LEVELS = [
+    ("root", os.environ.get("CRAWL_SEASONS_PATH", "seasons")),
+    ("season", os.environ.get("CRAWL_LEAGUE_GROUPS_PATH", "seasons/{id}/league-groups")),
+    ("league_group", os.environ.get("CRAWL_LEAGUES_PATH", "league-groups/{id}/leagues")),
+    ("league", os.environ.get("CRAWL_PLAYS_PATH", "leagues/{id}/plays")),
+]
+# Po tylu sekundach węzeł niezmienionego rodzica jest sprawdzany ponownie (warunkowo)
+CRAWL_RECHECK_AGE = float(os.environ.get("CRAWL_RECHECK_AGE", "86400"))
+# Tyle węzłów poziomu pobieramy naraz (8 × domyślne FETCH_WORKERS); po każdej
+# porcji commit i zwolnienie treści odpowiedzi
+CRAWL_SLICE = int(os.environ.get("CRAWL_SLICE", "64"))
+CHILD_KIND = {"root": "season", "season": "league_group", "league_group": "league", "league": "group"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    parent TEXT,
+    season TEXT,
+    name TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    checked_at REAL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent);
+CREATE TABLE IF NOT EXISTS teams (
+    name_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    season TEXT,
+    PRIMARY KEY (name_key, group_id)
+);
+CREATE INDEX IF NOT EXISTS teams_group ON teams (group_id);
+"""
+
+def connect(path=COMPETITION_INDEX):
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+def node_url(kind, node_id):
+    if kind == "group":
+        return matches_url(node_id)
+    path = dict(LEVELS)[kind]
+    return f"{API_BASE}/{path.format(id=node_id)}"
+
+def items_of(data):
+    """Lista elementów z odpowiedzi: sama tablica albo obiekt z ``items``/``data``"""
+    if isinstance(data, dict):
+        data = data.get("items") or data.get("data") or []
+    return [item for item in data if isinstance(item, dict)]
+
+def children_of(data):
+    """[(id, nazwa)] dzieci węzła z odpowiedzi API"""
+    children = []
+    for item in items_of(data):
+        if item.get("id"):
+            children.append((str(item["id"]), item.get("name") or item.get("title") or ""))
+    return children
+
+def team_names(matches):
+    names = set()
+    for match in items_of(matches):
+        for side in ("host", "guest"):
+            name = (match.get(side) or {}).get("name")
+            if name:
+                names.add(name)
+    return names
+
+def validators(row):
+    headers = {}
+    if row and row["etag"]:
+        headers["If-None-Match"] = row["etag"]
+    if row and row["last_modified"]:
+        headers["If-Modified-Since"] = row["last_modified"]
+    return headers
+
+def save_children(db, kind, node_id, season, children):
+    """Zastępuje dzieci węzła; istniejące zachowują walidatory, zniknięte są usuwane z poddrzewem"""
+    child_kind = CHILD_KIND[kind]
+    known = {r["id"] for r in db.execute("SELECT id FROM nodes WHERE parent = ? AND kind = ?", (node_id, child_kind))}
+    current = dict(children)
+    for child_id, name in children:
+        child_season = child_id if child_kind == "season" else season
+        db.execute("INSERT INTO nodes (kind, id, parent, season, name) VALUES (?, ?, ?, ?, ?) "
+                   "ON CONFLICT (kind, id) DO UPDATE SET parent = excluded.parent, name = excluded.name",
+                   (child_kind, child_id, node_id, child_season, name))
+    for gone in known - current.keys():
+        delete_subtree(db, child_kind, gone)
+
+def delete_subtree(db, kind, node_id):
+    if kind == "group":
+        db.execute("DELETE FROM teams WHERE group_id = ?", (node_id,))
+    else:
+        child_kind = CHILD_KIND[kind]
+        for row in db.execute("SELECT id FROM nodes WHERE parent = ? AND kind = ?", (node_id, child_kind)).fetchall():
+            delete_subtree(db, child_kind, row["id"])
+    db.execute("DELETE FROM nodes WHERE kind = ? AND id = ?", (kind, node_id))
+
+def save_teams(db, group_id, season, names):
+    db.execute("DELETE FROM teams WHERE group_id = ?", (group_id,))
+    db.executemany("INSERT OR REPLACE INTO teams (name_key, name, group_id, season) VALUES (?, ?, ?, ?)",
+                   [(name.lower(), name, group_id, season) for name in names])
+
+def crawl(db, seasons=None, full=False):
+    """Przechodzi hierarchię poziomami; zwraca liczniki {fetched, not_modified, changed, errors}"""
+    stats = dict.fromkeys(("fetched", "not_modified", "changed", "errors"), 0)
+    if seasons:
+        for season in seasons:
+            db.execute("INSERT OR IGNORE INTO nodes (kind, id, season) VALUES ('season', ?, ?)", (season, season))
+        frontier = [("season", s) for s in seasons]
+    else:
+        db.execute("INSERT OR IGNORE INTO nodes (kind, id) VALUES ('root', '')")
+        frontier = [("root", "")]
+
+    while frontier:
+        next_frontier = []
+        for start in range(0, len(frontier), CRAWL_SLICE):
+            next_frontier += crawl_slice(db, frontier[start:start + CRAWL_SLICE], stats, full)
+            db.commit()
+        frontier = next_frontier
+    return stats
+
+def crawl_slice(db, nodes, stats, full):
+    """Pobiera i zapisuje porcję węzłów jednego poziomu; zwraca dzieci do odwiedzenia"""
+    rows = {(k, i): db.execute("SELECT * FROM nodes WHERE kind = ? AND id = ?", (k, i)).fetchone()
+            for k, i in nodes}
+    urls = {node: node_url(*node) for node in nodes}
+    responses = api_get_many(urls.values(), {urls[n]: validators(rows[n]) for n in nodes})
+    children = []
+    now = time.time()
+    for node in nodes:
+        kind, node_id = node
+        row, response = rows[node], responses[urls[node]]
+        stats["fetched"] += 1
+        changed = False
+        if response is None or response.status_code not in (200, 304):
+            stats["errors"] += 1
+            print(f"{urls[node]}: {'no response' if response is None else response.status_code}")
+        elif response.status_code == 304:
+            stats["not_modified"] += 1
+        else:
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            changed = body_hash != row["body_hash"]
+            if changed:
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    print(f"{urls[node]}: invalid JSON: {e}")
+                    stats["errors"] += 1
+                    continue
+                if kind == "group":
+                    save_teams(db, node_id, row["season"], team_names(data))
+                else:
+                    save_children(db, kind, node_id, row["season"], children_of(data))
+                stats["changed"] += 1
+            db.execute("UPDATE nodes SET etag = ?, last_modified = ?, body_hash = ? WHERE kind = ? AND id = ?",
+                       (response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                        body_hash, kind, node_id))
+        db.execute("UPDATE nodes SET checked_at = ? WHERE kind = ? AND id = ?", (now, kind, node_id))
+        if kind != "group":
+            children += children_to_visit(db, kind, node_id, changed, full, now)
+    return children
+
+def children_to_visit(db, kind, node_id, changed, full, now):
+    """Dzieci do odwiedzenia: wszystkie, gdy lista rodzica się zmieniła (albo ``full``);
+    inaczej nowe i sprawdzane dawniej niż ``CRAWL_RECHECK_AGE`` temu"""
+    child_kind = CHILD_KIND[kind]
+    query, params = "SELECT id FROM nodes WHERE parent = ? AND kind = ?", [node_id, child_kind]
+    if not (changed or full):
+        query += " AND (checked_at IS NULL OR checked_at <= ?)"
+        params.append(now - CRAWL_RECHECK_AGE)
+    return [(child_kind, r["id"]) for r in db.execute(query, params)]
+
+def groups_for_team(team, db=None):
+    """Grupy drużyny w najnowszym sezonie, w którym występuje (dokładna nazwa, potem team_match)"""
+    own = db is None
+    if own:
+        if not os.path.exists(COMPETITION_INDEX):
+            return []
+        db = connect()
+    try:
+        keys = [team.lower()]
+        if not db.execute("SELECT 1 FROM teams WHERE name_key = ?", keys).fetchone():
+            names = frozenset(r["name_key"] for r in db.execute("SELECT DISTINCT name_key FROM teams"))
+            keys = sorted(index_for(names).lookup(team))
+        if not keys:
+            return []
+        rows = db.execute("SELECT t.group_id, t.season, s.name AS season_name FROM teams t "
+                          "LEFT JOIN nodes s ON s.kind = 'season' AND s.id = t.season "
+                          f"WHERE t.name_key IN ({','.join('?' * len(keys))})", keys).fetchall()
+        if not rows:
+            return []
+        # Nazwy sezonów to np. "2025/2026" — najnowszy sortuje się najwyżej
+        latest = max(rows, key=lambda r: r["season_name"] or "")["season"]
+        return sorted({r["group_id"] for r in rows if r["season"] == latest})
+    finally:
+        if own:
+            db.close()
+
+def print_stats(db):
+    for kind in ("season", "league_group", "league", "group"):
+        count = db.execute("SELECT COUNT(*) FROM nodes WHERE kind = ?", (kind,)).fetchone()[0]
+        print(f"{kind:13s} {count}")
+    print(f"{'teams':13s} {db.execute('SELECT COUNT(DISTINCT name_key) FROM teams').fetchone()[0]}")
+
+def main(argv):
+    if not argv or argv[0] not in ("crawl", "find", "stats"):
+        sys.exit(f"usage: {sys.argv[0]} crawl [--season ID ...] [--full] | find TEAM | stats")
+    with closing(connect()) as db:
+        if argv[0] == "crawl":
+            seasons = [argv[i + 1] for i, a in enumerate(argv) if a == "--season" and i + 1 < len(argv)]
+            started = time.perf_counter()
+            stats = crawl(db, seasons or None, full="--full" in argv)
+            print(f"Crawl done in {time.perf_counter() - started:.1f}s: {json.dumps(stats)}")
+            print_stats(db)
+        elif argv[0] == "find":
+            team = " ".join(argv[1:])
+            for group in groups_for_team(team, db):
+                print(f"{group}  {matches_url(group)}")
+        else:
+            print_stats(db)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,100 @@
+"""Stan kalendarza per mecz i przyrostowe łatanie pliku ICS.
+
+Dla każdego kalendarza trzymamy plik stanu z hashem, numerem SEQUENCE,
+chwilą ostatniej zmiany (DTSTAMP) i gotowym blokiem VEVENT każdego meczu. Przy kolejnym przebiegu
+serializowane są tylko mecze dodane lub zmienione, usunięte znikają,
+a pozostałe bloki są przepisywane z pliku stanu bez zmian.
+"""
+
+import hashlib, json, os
+from datetime import datetime, timezone
+
+import metrics
+from atomic_output import locked, write_atomic
+from ics_writer import CALENDAR_FOOTER, calendar_header, format_dtstamp, serialize_vevent
+from scrape_to_ics import fixture_key, to_dt
+
+STATE_VERSION = 2
+
+def state_path_for(out):
+    """Plik stanu leży obok kalendarza: calendars/x.ics -> calendars/.x.ics.state.json"""
+    head, tail = os.path.split(out)
+    return os.path.join(head, f".{tail}.state.json")
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION:
+        return {}
+    return state.get("fixtures", {})
+
+def save_state(fixtures_state, path):
+    write_atomic(path, json.dumps({"version": STATE_VERSION, "fixtures": fixtures_state},
+                                  ensure_ascii=False, indent=1, sort_keys=True))
+
+def fixture_hash(fix, team):
+    payload = json.dumps([team.lower(), fix], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def diff_fixtures(old_state, fixtures, team):
+    """Zwraca (added, changed, removed) — zbiory kluczy meczów — oraz mapę klucz -> (fixture, hash)"""
+    current = {}
+    for f in fixtures:
+        current[fixture_key(f)] = (f, fixture_hash(f, team))
+    added = current.keys() - old_state.keys()
+    removed = old_state.keys() - current.keys()
+    changed = {k for k in current.keys() & old_state.keys()
+               if current[k][1] != old_state[k]["hash"]}
+    return added, changed, removed, current
+
+def sort_key(fix):
+    dt = to_dt(fix["date"], fix["time"])
+    return dt.strftime("%Y%m%dT%H%M") if fix["time"] else dt.strftime("%Y%m%d")
+
+def update_calendar(fixtures, out, team, state_path=None, now=None, columns=None):
+    """Łata kalendarz ``out`` tylko o zmienione mecze; zwraca (added, changed, removed)
+
+    ``columns`` — opcjonalne [(DOM?, przesunięcie alarmu w s)] równoległe do
+    ``fixtures``, policzone hurtowo (fixture_table). Cały odczyt stanu i zapis
+    odbywa się pod blokadą ``out`` (atomic_output.locked).
+    """
+    state_path = state_path or state_path_for(out)
+    with locked(out):
+        return _update_calendar(fixtures, out, team, state_path, now, columns)
+
+def _update_calendar(fixtures, out, team, state_path, now, columns):
+    old_state = load_state(state_path) if os.path.exists(out) else {}
+    added, changed, removed, current = diff_fixtures(old_state, fixtures, team)
+    # Wpisy sprzed zapisywania chwili zmiany mają DTSTAMP z daty meczu — do odświeżenia
+    stale = {k for k in current.keys() & old_state.keys() if "dtstamp" not in old_state[k]}
+    if not (added or changed or removed or stale) and os.path.exists(out):
+        return added, changed, removed
+
+    dtstamp = format_dtstamp(now or datetime.now(timezone.utc))
+    precomputed = dict(zip(map(fixture_key, fixtures), columns)) if columns else {}
+    new_state = {}
+    with metrics.stage("serialize"):
+        for key, (fix, h) in current.items():
+            if key in added:
+                sequence = 0
+            elif key in changed:
+                sequence = old_state[key]["sequence"] + 1
+            elif key in stale:
+                sequence = old_state[key]["sequence"]
+            else:
+                new_state[key] = old_state[key]
+                continue
+            new_state[key] = {"hash": h, "sequence": sequence, "sort": sort_key(fix), "dtstamp": dtstamp,
+                              "vevent": serialize_vevent(fix, team, sequence, dtstamp, *precomputed.get(key, ()))}
+
+        blocks = [new_state[k]["vevent"] for k in sorted(new_state, key=lambda k: (new_state[k]["sort"], k))]
+        content = calendar_header() + "".join(blocks) + CALENDAR_FOOTER
+    with metrics.stage("write"):
+        # Najpierw kalendarz, potem stan: po awarii między nimi stary stan + te same
+        # zmiany dają identyczny plik, który write_atomic pominie
+        write_atomic(out, content)
+        save_state(new_state, state_path)
+    return added, changed, removed
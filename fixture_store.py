@@ -0,0 +1,202 @@
+"""Historia meczów w SQLite: jeden wiersz na wersję meczu.
+
+Każde pobranie grupy rozgrywkowej trafia do ``ingest()``: mecze nowe i zmienione
+dostają nowy wiersz, poprzednia wersja (i mecze, które zniknęły) dostaje
+``valid_to``. Bieżący stan to wiersze z ``valid_to IS NULL``, stan z dowolnej
+chwili — wiersze ważne w tej chwili, więc stare kalendarze da się odbudować bez
+ponownego pobierania. Zapytania idą po indeksach (drużyna + data, grupa,
+czas zmiany); nazwy drużyn są rozwijane przez małą tabelę ``teams`` tak jak
+w fixtures_for_team (dokładna nazwa albo dopasowanie z team_match).
+
+Baza działa w trybie WAL: odczyty (serwer, zapytania) nie blokują zapisu.
+Użycie: ``python fixture_store.py stats | show DRUŻYNA [--as-of ISO] | changes DRUŻYNA [--since ISO]``
+"""
+
+import hashlib, json, os, sqlite3, sys, time
+from datetime import datetime
+
+import metrics
+from team_match import index_for, resolve_names
+
+FIXTURE_DB = os.environ.get("FIXTURE_DB", ".fixtures.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixture_versions (
+    id INTEGER PRIMARY KEY,
+    competition TEXT NOT NULL,
+    match_key TEXT NOT NULL,
+    home_key TEXT NOT NULL,
+    away_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    valid_from REAL NOT NULL,
+    valid_to REAL
+);
+CREATE INDEX IF NOT EXISTS fv_current ON fixture_versions (competition, match_key, valid_to);
+CREATE INDEX IF NOT EXISTS fv_home ON fixture_versions (home_key, day);
+CREATE INDEX IF NOT EXISTS fv_away ON fixture_versions (away_key, day);
+CREATE INDEX IF NOT EXISTS fv_valid_from ON fixture_versions (valid_from);
+CREATE INDEX IF NOT EXISTS fv_valid_to ON fixture_versions (valid_to);
+CREATE TABLE IF NOT EXISTS teams (
+    name_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+"""
+
+def iso_day(date_s):
+    """"15.11.2025" -> "2025-11-15" (sortowalne tekstowo)"""
+    d, m, y = date_s.split(".")
+    return f"{y}-{m}-{d}"
+
+def encode(fix):
+    """(JSON wersji, jej hash) — ten sam tekst trafia do bazy i do porównania"""
+    data = json.dumps(fix, ensure_ascii=False, sort_keys=True)
+    return data, hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def timestamp(value):
+    """Sekundy epoki z liczby albo daty ISO (None zostaje None)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+class FixtureStore:
+    def __init__(self, path=FIXTURE_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # W WAL synchronous=NORMAL nie grozi uszkodzeniem bazy, najwyżej utratą ostatniej transakcji
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ingest(self, competition, fixtures, team=None, now=None):
+        """Zapisuje bieżący stan grupy ``competition``; zwraca (added, changed, removed) — klucze meczów
+
+        Z ``team`` lista zawiera tylko mecze tej drużyny (np. po strumieniowym
+        filtrowaniu), więc jako usunięte traktujemy tylko jej mecze.
+        """
+        from scrape_to_ics import fixture_key
+        now = time.time() if now is None else now
+        current = {}
+        for fix in fixtures:
+            current[fixture_key(fix)] = fix
+        with metrics.stage("store_ingest"), self.db:
+            stored = {key: (row_id, h, home, away) for row_id, key, h, home, away in self.db.execute(
+                "SELECT id, match_key, hash, home_key, away_key FROM fixture_versions "
+                "WHERE competition = ? AND valid_to IS NULL", (competition,))}
+            encoded = {key: encode(fix) for key, fix in current.items()}
+            added = current.keys() - stored.keys()
+            changed = {k for k in current.keys() & stored.keys() if encoded[k][1] != stored[k][1]}
+            removed = stored.keys() - current.keys()
+            if team:
+                names = {name for k in removed for name in stored[k][2:]}
+                names |= {fix[side].lower() for fix in current.values() for side in ("home", "away")}
+                chosen = resolve_names(team, names - {""})
+                removed = {k for k in removed if stored[k][2] in chosen or stored[k][3] in chosen}
+
+            self.db.executemany("UPDATE fixture_versions SET valid_to = ? WHERE id = ?",
+                                [(now, stored[k][0]) for k in changed | removed])
+            self.db.executemany(
+                "INSERT INTO fixture_versions (competition, match_key, home_key, away_key, day, hash, data, valid_from) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(competition, k, current[k]["home"].lower(), current[k]["away"].lower(), iso_day(current[k]["date"]),
+                  encoded[k][1], encoded[k][0], now) for k in added | changed])
+            self.db.executemany("INSERT OR IGNORE INTO teams (name_key, name) VALUES (?, ?)",
+                                {(current[k][side].lower(), current[k][side])
+                                 for k in added | changed for side in ("home", "away") if current[k][side]})
+        metrics.incr("store_versions", len(added) + len(changed))
+        return added, changed, removed
+
+    def team_keys(self, team):
+        """Nazwy (lower) pasujące do ``team``: dokładna, a gdy jej nie ma — dopasowane przez team_match"""
+        key = team.lower()
+        if self.db.execute("SELECT 1 FROM teams WHERE name_key = ?", (key,)).fetchone():
+            return [key]
+        keys = frozenset(k for (k,) in self.db.execute("SELECT name_key FROM teams"))
+        return sorted(index_for(keys).lookup(team))
+
+    def _select(self, columns, team, competitions, date_from, date_to, where, params):
+        """Zapytanie po wersjach; z ``team`` jako UNION po indeksach gospodarza i gościa"""
+        filters, args = list(where), list(params)
+        if competitions:
+            filters.append(f"competition IN ({','.join('?' * len(competitions))})")
+            args += competitions
+        if date_from:
+            filters.append("day >= ?")
+            args.append(date_from)
+        if date_to:
+            filters.append("day <= ?")
+            args.append(date_to)
+        if team is None:
+            sql = f"SELECT {columns} FROM fixture_versions WHERE {' AND '.join(filters) or '1'}"
+            return self.db.execute(sql, args)
+        keys = self.team_keys(team)
+        if not keys:
+            return []
+        marks = ",".join("?" * len(keys))
+        parts = [f"SELECT id, {columns} FROM fixture_versions WHERE {side} IN ({marks})"
+                 + "".join(f" AND {f}" for f in filters) for side in ("home_key", "away_key")]
+        # UNION usuwa duplikaty (mecz drużyny z samą sobą), id dba o różne wersje o tej samej treści
+        sql = f"SELECT {columns} FROM ({parts[0]} UNION {parts[1]})"
+        return self.db.execute(sql, keys + args + keys + args)
+
+    def fixtures(self, team=None, competitions=None, date_from=None, date_to=None, as_of=None):
+        """Mecze (dict jak z match_to_fixture) bieżące albo z chwili ``as_of``; daty ISO "YYYY-MM-DD" """
+        if as_of is None:
+            where, params = ["valid_to IS NULL"], []
+        else:
+            when = timestamp(as_of)
+            where, params = ["valid_from <= ?", "(valid_to IS NULL OR valid_to > ?)"], [when, when]
+        with metrics.stage("store_query"):
+            rows = self._select("day, data", team, competitions, date_from, date_to, where, params)
+            return sorted((json.loads(data) for _, data in rows),
+                          key=lambda f: (iso_day(f["date"]), f["time"] or "", f["home"], f["away"]))
+
+    def changes(self, team=None, since=None, competitions=None):
+        """Wersje, które pojawiły się albo wygasły od ``since``: [(valid_from, valid_to, fixture)]"""
+        since = timestamp(since) or 0
+        with metrics.stage("store_query"):
+            rows = self._select("valid_from, valid_to, data", team, competitions, None, None,
+                                ["(valid_from >= ? OR valid_to >= ?)"], [since, since])
+            return [(vf, vt, json.loads(data)) for vf, vt, data in sorted(rows, key=lambda r: (r[0], r[1] or 0))]
+
+    def stats(self):
+        total, current = self.db.execute(
+            "SELECT COUNT(*), COUNT(*) - COUNT(valid_to) FROM fixture_versions").fetchone()
+        competitions = self.db.execute("SELECT COUNT(DISTINCT competition) FROM fixture_versions").fetchone()[0]
+        teams = self.db.execute("SELECT COUNT(*) FROM teams").fetchone()[0]
+        return {"versions": total, "current": current, "competitions": competitions, "teams": teams}
+
+def describe(fix):
+    return f"{fix['date']} {fix['time'] or '--:--'}  {fix['home']} – {fix['away']}"
+
+def main(argv):
+    def option(name):
+        return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+
+    if not argv or argv[0] not in ("stats", "show", "changes"):
+        sys.exit(f"usage: {sys.argv[0]} stats | show TEAM [--as-of ISO] | changes TEAM [--since ISO]")
+    with FixtureStore() as store:
+        if argv[0] == "stats":
+            print(json.dumps(store.stats()))
+            return
+        team = argv[1] if len(argv) > 1 and not argv[1].startswith("--") else None
+        if argv[0] == "show":
+            for fix in store.fixtures(team, as_of=option("--as-of")):
+                print(describe(fix))
+        else:
+            for valid_from, valid_to, fix in store.changes(team, option("--since")):
+                stamp = lambda t: datetime.fromtimestamp(t).isoformat(timespec="seconds") if t else "now"
+                print(f"{stamp(valid_from)} .. {stamp(valid_to):19s}  {describe(fix)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,171 @@
+"""Kolumnowa tabela meczów (NumPy) do eksportów całych regionów.
+
+Zamiast listy słowników trzymamy tablice: identyfikatory drużyn, czas
+rozpoczęcia (epoch UTC), dzień lokalny, flagę meczu bez godziny.
+Czasy startu, przesunięcia alarmów poniedziałkowych, flagi DOM/WYJAZD
+i filtr drużyny liczone są hurtowo. Strefa czasowa jest odpytywana tylko
+raz na unikalny dzień, a nie dla każdego wiersza.
+
+Tryb wsadowy (batch) przechodzi na tabelę, gdy w przebiegu jest co najmniej
+``TABLE_MIN_FIXTURES`` meczów i jest zainstalowane numpy
+(``requirements-table.txt``): filtr drużyny, flagi DOM/WYJAZD i alarmy trafiają
+do ``update_calendar`` policzone hurtowo. Przy małych przebiegach wystarczą
+dotychczasowe ``to_dt()``, ``monday_alarm_for()`` i ``is_home()`` per wiersz.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest potrzebne tylko w trybie kolumnowym
+    np = None
+
+from scrape_to_ics import ALARM_TIME, TZ
+from team_match import index_for
+
+TABLE_MIN_FIXTURES = int(os.environ.get("TABLE_MIN_FIXTURES", "2000"))
+
+EPOCH = datetime(1970, 1, 1)
+
+def use_table(n_fixtures):
+    """Czy przebieg z ``n_fixtures`` meczami liczyć kolumnowo (i czy jest numpy)"""
+    return np is not None and n_fixtures >= TABLE_MIN_FIXTURES
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("fixture_table requires numpy (pip install numpy)")
+
+def _offset(days, minutes):
+    return int(TZ.utcoffset(EPOCH + timedelta(days=days, minutes=minutes)).total_seconds())
+
+def _local_to_utc(days, minutes):
+    """Lokalny (dzień od epoki, minuta dnia) -> epoch UTC
+
+    Strefa jest odpytywana raz na unikalny dzień; tylko w dni zmiany czasu
+    (offset o północy różny od offsetu o 23:59) liczymy offset per wiersz.
+    """
+    unique, inverse = np.unique(days, return_inverse=True)
+    offsets = np.empty(len(unique), dtype=np.int64)
+    changing = []
+    for i, day in enumerate(unique.tolist()):
+        offsets[i] = _offset(day, 0)
+        if offsets[i] != _offset(day, 1439):
+            changing.append(i)
+    row_offsets = offsets[inverse]
+    for i in changing:
+        for row in np.flatnonzero(inverse == i).tolist():
+            row_offsets[row] = _offset(int(days[row]), int(minutes[row]))
+    return (days.astype(np.int64) * 1440 + minutes) * 60 - row_offsets
+
+class FixtureTable:
+    """Tabela meczów: kolumny NumPy + słownik nazw drużyn"""
+
+    def __init__(self, teams, home_id, away_id, day, minute, all_day, extra=None):
+        self.teams = teams                  # id -> nazwa drużyny
+        self.home_id = home_id              # int32
+        self.away_id = away_id              # int32
+        self.day = day                      # int32, lokalny dzień od 1970-01-01
+        self.minute = minute                # int16, minuta dnia (0 dla meczów bez godziny)
+        self.all_day = all_day              # bool, mecz bez godziny
+        self.extra = extra or [{}] * len(day)  # pozostałe pola (stadium, state, ...) per wiersz
+        self._team_ids = {name.lower(): i for i, name in enumerate(teams)}
+        self._start = None
+        self._alarm = {}
+
+    def __len__(self):
+        return len(self.day)
+
+    @classmethod
+    def from_fixtures(cls, fixtures, keep_extra=True):
+        _require_numpy()
+        teams, ids = [], {}
+
+        def team_id(name):
+            if name not in ids:
+                ids[name] = len(teams)
+                teams.append(name)
+            return ids[name]
+
+        n = len(fixtures)
+        home_id = np.fromiter((team_id(f["home"]) for f in fixtures), dtype=np.int32, count=n)
+        away_id = np.fromiter((team_id(f["away"]) for f in fixtures), dtype=np.int32, count=n)
+        # "dd.mm.rrrr" -> datetime64[D] bez strptime
+        iso = np.array([f["date"][6:10] + "-" + f["date"][3:5] + "-" + f["date"][0:2] for f in fixtures],
+                       dtype="datetime64[D]")
+        day = iso.astype(np.int64).astype(np.int32)
+        all_day = np.fromiter((not f["time"] for f in fixtures), dtype=bool, count=n)
+        minute = np.fromiter((int(f["time"][:2]) * 60 + int(f["time"][3:5]) if f["time"] else 0
+                              for f in fixtures), dtype=np.int16, count=n)
+        extra = None
+        if keep_extra:
+            base = {"home", "away", "date", "time"}
+            extra = [{k: v for k, v in f.items() if k not in base} for f in fixtures]
+        return cls(teams, home_id, away_id, day, minute, all_day, extra)
+
+    # --- kolumny liczone hurtowo ---
+
+    def start_epoch(self):
+        """Start meczu jako epoch UTC (dla meczów bez godziny: lokalna północ)"""
+        if self._start is None:
+            self._start = _local_to_utc(self.day, self.minute.astype(np.int64))
+        return self._start
+
+    def weekday(self):
+        # 1970-01-01 to czwartek; poniedziałek = 0 jak w datetime.weekday()
+        return (self.day + 3) % 7
+
+    def alarm_offsets(self, alarm_time=ALARM_TIME):
+        """Przesunięcie alarmu (poniedziałek tygodnia meczu, ``alarm_time``) względem startu, w sekundach
+
+        Jak w ``monday_alarm_for()``: różnica czasu lokalnego (ta sama strefa po obu stronach).
+        """
+        if alarm_time not in self._alarm:
+            hh, mm = map(int, alarm_time.split(":"))
+            minutes = -self.weekday().astype(np.int64) * 1440 + (hh * 60 + mm) - self.minute
+            self._alarm[alarm_time] = minutes * 60
+        return self._alarm[alarm_time]
+
+    def team_ids(self, team):
+        """Identyfikatory drużyn pasujących do ``team`` (dokładnie albo przez team_match)"""
+        key = team.lower()
+        if key in self._team_ids:
+            return np.array([self._team_ids[key]], dtype=np.int32)
+        names = index_for(frozenset(self._team_ids)).lookup(team)
+        return np.array(sorted(self._team_ids[name] for name in names), dtype=np.int32)
+
+    def team_mask(self, team):
+        ids = self.team_ids(team)
+        return np.isin(self.home_id, ids) | np.isin(self.away_id, ids)
+
+    def home_mask(self, team):
+        return np.isin(self.home_id, self.team_ids(team))
+
+    # --- powrót do słowników dla dotychczasowego kodu ---
+
+    def to_fixtures(self, mask=None):
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        dates = (self.day[rows].astype("datetime64[D]")).astype(str)
+        fixtures = []
+        for row, iso in zip(rows.tolist(), dates.tolist()):
+            minute = int(self.minute[row])
+            fixtures.append({
+                "home": self.teams[self.home_id[row]],
+                "away": self.teams[self.away_id[row]],
+                "date": f"{iso[8:10]}.{iso[5:7]}.{iso[0:4]}",
+                "time": None if self.all_day[row] else f"{minute // 60:02d}:{minute % 60:02d}",
+                **self.extra[row],
+            })
+        return fixtures
+
+    def for_team(self, team):
+        """Mecze drużyny jako słowniki — odpowiednik ``fixtures_for_team()``"""
+        return self.to_fixtures(self.team_mask(team))
+
+    def for_team_with_columns(self, team, alarm_time=ALARM_TIME):
+        """(mecze drużyny, [(DOM?, przesunięcie alarmu w s)]) — wejście dla ``update_calendar``"""
+        ids = self.team_ids(team)
+        home = np.isin(self.home_id, ids)
+        mask = home | np.isin(self.away_id, ids)
+        columns = zip(home[mask].tolist(), self.alarm_offsets(alarm_time)[mask].tolist())
+        return self.to_fixtures(mask), list(columns)
@@ -0,0 +1,117 @@
+"""Jednoprzebiegowy parser meczów z wyrenderowanego HTML (ścieżka zapasowa).
+
+Strona jest dzielona na tagi i węzły tekstowe jednym skompilowanym
+wzorcem, a mecze wykrywa maszyna stanów: ostatnia linia tekstu postaci
+"Gospodarz – Gość" łączy się z najbliższą datą "dd.mm.rrrr[, HH:MM]"
+występującą najwyżej ``MAX_GAP`` znaków dalej. Każdy znak wejścia jest
+oglądany stałą liczbę razy, a wejście może przychodzić w kawałkach.
+"""
+
+import re
+from html import unescape
+
+TOKEN_RE = re.compile(r"<(/?)([a-zA-Z][\w:-]*)?[^>]*>|[^<]+|<")
+DATE_RE = re.compile(r"(\d{2}\.\d{2}\.\d{4})(?:\s*,\s*(\d{2}:\d{2}))?")
+# Separatory pary od najpewniejszego: półpauza, dywiz otoczony spacjami, goły
+# dywiz. Nazwy klubów same zawierają dywizy ("Bruk-Bet Termalica Nieciecza")
+DASH_RES = (re.compile(r"\s*–\s*"), re.compile(r"\s+-\s+"), re.compile(r"\s*-\s*"))
+SPACE_RE = re.compile(r"\s+")
+SKIP_TAGS = {"script", "style", "svg"}
+# Maksymalna odległość (w znakach HTML) między parą drużyn a datą
+MAX_GAP = 200
+CHUNK_SIZE = 64 * 1024
+
+def _split_pair(line):
+    """"Gospodarz – Gość" -> (home, away) albo None"""
+    for dash_re in DASH_RES:
+        m = dash_re.search(line)
+        if m:
+            break
+    else:
+        return None
+    home = SPACE_RE.sub(" ", line[:m.start()]).strip()
+    away = SPACE_RE.sub(" ", line[m.end():]).strip(" ,")
+    if len(home) < 3 or len(away) < 3:
+        return None
+    return home, away
+
+class FixtureScanner:
+    """Przyrostowy skaner: ``feed(chunk)`` zwraca mecze znalezione w tym kawałku"""
+
+    def __init__(self, max_gap=MAX_GAP):
+        self.max_gap = max_gap
+        self.buffer = ""
+        self.offset = 0          # pozycja początku bufora w całym dokumencie
+        self.skip_until = None   # nazwa tagu, którego zamknięcia szukamy (script/style/svg)
+        self.pair = None         # (home, away, pozycja końca pary)
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        # Przetwarzamy tylko do ostatniego "<" — dalej może być niedomknięty tag
+        # albo węzeł tekstowy, którego ciąg dalszy przyjdzie w następnym kawałku
+        return self._scan(max(self.buffer.rfind("<"), 0))
+
+    def close(self):
+        return self._scan(len(self.buffer))
+
+    def _scan(self, end):
+        fixtures = []
+        data, base = self.buffer, self.offset
+        for m in TOKEN_RE.finditer(data, 0, end):
+            token = m.group(0)
+            if token.startswith("<") and len(token) > 1:
+                name = (m.group(2) or "").lower()
+                if self.skip_until:
+                    if m.group(1) and name == self.skip_until:
+                        self.skip_until = None
+                elif name in SKIP_TAGS and not m.group(1) and not token.endswith("/>"):
+                    self.skip_until = name
+                continue
+            if not self.skip_until:
+                self._text(token, base + m.start(), fixtures)
+        self.buffer = data[end:]
+        self.offset = base + end
+        return fixtures
+
+    def _text(self, text, pos, fixtures):
+        if "&" in text:
+            text = unescape(text)
+        line_start = 0
+        for line in text.split("\n"):
+            line_pos = pos + line_start
+            line_start += len(line) + 1
+            if not line.strip():
+                continue
+            date = DATE_RE.search(line)
+            if date:
+                head = _split_pair(line[:date.start()])
+                if head:
+                    self.pair = (head[0], head[1], line_pos + date.start())
+                if self.pair and line_pos + date.start() - self.pair[2] <= self.max_gap:
+                    home, away, _ = self.pair
+                    fixtures.append({"home": home, "away": away,
+                                     "date": date.group(1), "time": date.group(2)})
+                self.pair = None
+                continue
+            pair = _split_pair(line)
+            if pair:
+                self.pair = (pair[0], pair[1], line_pos + len(line))
+
+def iter_fixtures(chunks, max_gap=MAX_GAP):
+    """Generator meczów z kolejnych kawałków HTML (str)"""
+    scanner = FixtureScanner(max_gap)
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.close()
+
+def iter_text_chunks(text, size=CHUNK_SIZE):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+def iter_file_chunks(path, size=CHUNK_SIZE):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Dyskowy cache odpowiedzi HTTP z walidatorami ETag/Last-Modified.
+
+Treść każdej odpowiedzi leży w osobnym pliku, a ``index.json`` trzyma
+walidatory, rozmiar i czas ostatniego użycia. Cache jest wspólny dla
+wszystkich przebiegów, więc 304 znaczy tylko "bez zmian od ostatniego
+pobrania przez kogokolwiek" — o braku zmian dla danego kalendarza decyduje
+walidator zapisany razem z nim (``validator_of``). Po przekroczeniu
+``HTTP_CACHE_MAX_BYTES`` usuwane są najdawniej używane wpisy. Indeks jest
+zmieniany pod blokadą ``index.json.lock`` (atomic_output.locked), więc
+nakładające się procesy (cron, ``--schedule``) nie gubią sobie wpisów.
+
+Użycie z linii poleceń: ``python http_cache.py [list|clear]``
+"""
+
+import hashlib, json, os, sys, threading, time
+from contextlib import contextmanager
+
+from atomic_output import locked, write_atomic
+
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", ".http_cache")
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+def _index_path(cache_dir):
+    return os.path.join(cache_dir, "index.json")
+
+def _body_path(cache_dir, url):
+    return os.path.join(cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".body")
+
+_read_only = {"depth": 0}
+_read_only_lock = threading.Lock()
+
+@contextmanager
+def read_only():
+    """Blok, w którym cache jest tylko czytany: store/store_stream/touch niczego nie zapisują
+
+    Dla ``--check-only``: sprawdzenie nie może zmienić walidatorów, bo następny
+    przebieg dostałby 304 i nie przeniósłby zmiany do kalendarza.
+    """
+    with _read_only_lock:
+        _read_only["depth"] += 1
+    try:
+        yield
+    finally:
+        with _read_only_lock:
+            _read_only["depth"] -= 1
+
+def writable():
+    return _read_only["depth"] == 0
+
+def load_index(cache_dir=HTTP_CACHE_DIR):
+    try:
+        with open(_index_path(cache_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_index(index, cache_dir=HTTP_CACHE_DIR):
+    write_atomic(_index_path(cache_dir), json.dumps(index, indent=1, sort_keys=True))
+
+def _index_lock(cache_dir):
+    """Blokada indeksu między wątkami i procesami"""
+    return locked(_index_path(cache_dir))
+
+def validator_of(url, response, cache_dir=HTTP_CACHE_DIR):
+    """Walidator (ETag, a bez niego Last-Modified) treści, którą oddaje ``response``
+
+    Przy 304 bez nagłówków — walidator wpisu z cache, z którego pochodzi treść.
+    """
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    if not validator and response.status_code == 304:
+        entry = load_index(cache_dir).get(url) or {}
+        validator = entry.get("etag") or entry.get("last_modified")
+    return validator
+
+def conditional_headers(url, cache_dir=HTTP_CACHE_DIR):
+    """Nagłówki If-None-Match/If-Modified-Since dla zapisanego wpisu (albo {})"""
+    entry = load_index(cache_dir).get(url)
+    if not entry or not os.path.exists(_body_path(cache_dir, url)):
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def store(url, response, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+    """Zapisuje odpowiedź 200, jeśli serwer podał jakiś walidator"""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified) or not writable():
+        return False
+    body = response.content
+    with _index_lock(cache_dir):
+        write_atomic(_body_path(cache_dir, url), body)
+        _record(url, etag, last_modified, len(body), cache_dir, max_bytes)
+    return True
+
+def store_stream(url, response, chunks, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+    """Jak store(), ale zapisuje treść kawałkami w trakcie czytania i przepuszcza ``chunks``
+
+    Wpis trafia do indeksu dopiero po odczytaniu całej treści; przerwany
+    odczyt zostawia poprzednią wersję wpisu.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified) or not writable():
+        yield from chunks
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _body_path(cache_dir, url)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    size, complete = 0, False
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+                yield chunk
+        complete = True
+        with _index_lock(cache_dir):
+            os.replace(tmp, path)
+            _record(url, etag, last_modified, size, cache_dir, max_bytes)
+    finally:
+        if not complete:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+def _record(url, etag, last_modified, size, cache_dir, max_bytes):
+    """Dopisuje wpis do indeksu (wywoływane pod ``_index_lock``)"""
+    index = load_index(cache_dir)
+    now = time.time()
+    index[url] = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "size": size,
+        "stored_at": now,
+        "last_used": now,
+    }
+    evict(index, cache_dir, max_bytes)
+    save_index(index, cache_dir)
+
+def load_body(url, cache_dir=HTTP_CACHE_DIR):
+    """Zwraca zapisaną treść (bytes) i odnotowuje użycie wpisu; None gdy brak"""
+    try:
+        with open(_body_path(cache_dir, url), "rb") as f:
+            body = f.read()
+    except OSError:
+        return None
+    touch(url, cache_dir)
+    return body
+
+def iter_body(url, chunk_size=64 * 1024, cache_dir=HTTP_CACHE_DIR):
+    """Zapisana treść jako generator kawałków (bytes); None gdy brak wpisu"""
+    try:
+        f = open(_body_path(cache_dir, url), "rb")
+    except OSError:
+        return None
+    touch(url, cache_dir)
+
+    def chunks():
+        with f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+    return chunks()
+
+def touch(url, cache_dir=HTTP_CACHE_DIR):
+    if not writable():
+        return
+    with _index_lock(cache_dir):
+        index = load_index(cache_dir)
+        if url in index:
+            index[url]["last_used"] = time.time()
+            save_index(index, cache_dir)
+
+def evict(index, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+    """Usuwa najdawniej używane wpisy, aż suma rozmiarów zmieści się w limicie"""
+    total = sum(e["size"] for e in index.values())
+    for url in sorted(index, key=lambda u: index[u]["last_used"]):
+        if total <= max_bytes:
+            break
+        total -= index.pop(url)["size"]
+        try:
+            os.remove(_body_path(cache_dir, url))
+        except OSError:
+            pass
+
+def clear(cache_dir=HTTP_CACHE_DIR):
+    with _index_lock(cache_dir):
+        for url in load_index(cache_dir):
+            try:
+                os.remove(_body_path(cache_dir, url))
+            except OSError:
+                pass
+        save_index({}, cache_dir)
+
+def print_info(cache_dir=HTTP_CACHE_DIR):
+    index = load_index(cache_dir)
+    total = sum(e["size"] for e in index.values())
+    print(f"{cache_dir}: {len(index)} entries, {total / 1024:.1f} KiB "
+          f"(limit {HTTP_CACHE_MAX_BYTES / 1024 / 1024:.0f} MiB)")
+    for url, e in sorted(index.items(), key=lambda kv: -kv[1]["last_used"]):
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_used"]))
+        validator = e.get("etag") or e.get("last_modified")
+        print(f"  {e['size']:>9} B  used {used}  {validator}  {url}")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "list":
+        print_info()
+    elif command == "clear":
+        clear()
+        print(f"Cleared {HTTP_CACHE_DIR}")
+    else:
+        sys.exit(f"usage: {sys.argv[0]} [list|clear]")
@@ -0,0 +1,91 @@
+"""Współbieżne pobieranie wielu endpointów comp-api przez wspólną pulę połączeń."""
+
+import os, random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+MAX_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+MAX_PER_HOST = int(os.environ.get("FETCH_PER_HOST", "4"))
+RETRIES = int(os.environ.get("FETCH_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("FETCH_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("FETCH_BACKOFF_MAX", "8"))
+TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+def get_session():
+    """Zwraca współdzieloną sesję z pulą połączeń keep-alive"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def host_limit(url):
+    """Semafor ograniczający liczbę równoległych żądań do jednego hosta"""
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_limits[host]
+
+def backoff_delay(attempt):
+    # "Full jitter": losowo z przedziału [0, min(max, base * 2^attempt)]
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def get_with_retry(url, headers=None, session=None, retries=RETRIES, timeout=TIMEOUT, stream=False):
+    """GET z ponawianiem błędów sieci i odpowiedzi 429/5xx; zwraca Response albo None
+
+    Ze ``stream=True`` treść nie jest czytana — wywołujący czyta ją
+    (``iter_content``) i zamyka odpowiedź.
+    """
+    session = session or get_session()
+    for attempt in range(retries + 1):
+        try:
+            with host_limit(url):
+                response = session.get(url, headers=headers, timeout=timeout, stream=stream)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            response.close()
+            metrics.incr("http_retries")
+            print(f"{url}: status {response.status_code}, retrying ({attempt + 1}/{retries})...")
+        except requests.RequestException as e:
+            if attempt == retries:
+                print(f"{url}: request failed: {e}")
+                return None
+            metrics.incr("http_retries")
+            print(f"{url}: {e}, retrying ({attempt + 1}/{retries})...")
+        time.sleep(backoff_delay(attempt))
+
+def fetch_all(urls, headers=None, max_workers=MAX_WORKERS, url_headers=None):
+    """Pobiera wszystkie adresy równolegle; zwraca dict url -> Response|None
+
+    ``url_headers`` (url -> dict) dokłada nagłówki do pojedynczych żądań,
+    np. walidatory z cache odpowiedzi.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    session = get_session()
+    url_headers = url_headers or {}
+
+    def fetch(url):
+        return get_with_retry(url, {**(headers or {}), **url_headers.get(url, {})}, session)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        responses = pool.map(fetch, urls)
+        return dict(zip(urls, responses))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Wbudowany serwer HTTP z kalendarzami ICS renderowanymi na żądanie.
+
+Kalendarze nie są czytane z plików: serwer trzyma indeks meczów po drużynie
+(z listy meczów grup, w tym z cache odpowiedzi HTTP) i przy pierwszym żądaniu
+serializuje kalendarz przez ics_writer. Gotowe treści (zwykła i gzip) leżą
+w LRU w pamięci, kluczem jest wersja indeksu i parametry żądania, więc
+aplikacje kalendarzowe odpytujące ten sam adres dostają gotowe bajty albo 304.
+
+Trasy:
+
+- ``/`` — lista drużyn z linkami,
+- ``/teams/<drużyna>.ics?venue=DOM|WYJAZD&from=RRRR-MM-DD&to=RRRR-MM-DD``
+  (wszystkie parametry opcjonalne).
+
+Użycie: ``python ics_server.py [CONFIG]`` albo ``python scrape_to_ics.py --serve [--batch CONFIG]``
+"""
+
+import gzip, hashlib, html, os, sys, threading
+from collections import OrderedDict
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from batch import group_entries, load_batch_config
+from fixture_state import sort_key
+from ics_writer import iter_calendar
+from scrape_to_ics import (
+    GROUP, NOT_MODIFIED, fetch_matches_many, fixtures_for_team,
+    index_matches_by_team, is_home, to_dt,
+)
+
+SERVE_HOST = os.environ.get("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.environ.get("SERVE_PORT", "8080"))
+SERVE_CACHE_ENTRIES = int(os.environ.get("SERVE_CACHE_ENTRIES", "256"))
+# Jak często (s) odświeżać indeks meczów z API (zapytania warunkowe)
+SERVE_REFRESH = float(os.environ.get("SERVE_REFRESH", "900"))
+SERVE_MAX_AGE = int(os.environ.get("SERVE_MAX_AGE", "900"))
+# Mniejszych treści nie opłaca się kompresować
+GZIP_MIN_BYTES = 1024
+VENUES = {"DOM", "WYJAZD"}
+
+class BadRequest(ValueError):
+    pass
+
+class FixtureIndex:
+    """Indeks meczów po drużynie dla zestawu grup; ``version`` rośnie przy każdej zmianie"""
+
+    def __init__(self, groups, fetch=fetch_matches_many):
+        self.groups = list(groups)
+        self.fetch = fetch
+        self.by_group = {}
+        self.validators = {}   # grupa -> walidator listy, z której zbudowano indeks
+        self.teams = []
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Pobiera grupy; NOT_MODIFIED dla list w wersji już zaindeksowanej; True przy zmianie"""
+        seen = {g: v for g, v in self.validators.items() if g in self.by_group}
+        validators = {}
+        results = self.fetch(self.groups, seen, validators)
+
+        changed = {g: index_matches_by_team(m) for g, m in results.items()
+                   if m is not NOT_MODIFIED and m}
+        if not changed:
+            return False
+        with self.lock:
+            self.by_group = {**self.by_group, **changed}
+            for g in changed:
+                if g in validators:
+                    self.validators[g] = validators[g]
+                else:
+                    self.validators.pop(g, None)
+            self.teams = sorted({name for index in self.by_group.values()
+                                 for fixtures in index.values()
+                                 for f in fixtures for name in (f["home"], f["away"]) if name})
+            self.version += 1
+        return True
+
+    def fixtures(self, team):
+        """(wersja, mecze drużyny ze wszystkich grup); pusta lista gdy drużyny nie ma"""
+        with self.lock:
+            version, by_group = self.version, self.by_group
+        fixtures, seen = [], set()
+        for index in by_group.values():
+            for f in fixtures_for_team(index, team):
+                key = (f.get("id"), f["home"], f["away"], f["date"])
+                if key not in seen:
+                    seen.add(key)
+                    fixtures.append(f)
+        return version, fixtures
+
+class RenderCache:
+    """LRU gotowych treści: klucz -> (etag, treść, treść gzip albo None)"""
+
+    def __init__(self, max_entries=SERVE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+def parse_day(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be YYYY-MM-DD")
+
+def calendar_params(query):
+    """Parametry z query string -> (venue, od, do); BadRequest przy złych wartościach"""
+    params = parse_qs(query)
+    venue = params.get("venue", [""])[0].upper() or None
+    if venue and venue not in VENUES:
+        raise BadRequest(f"venue must be one of {', '.join(sorted(VENUES))}")
+    start = parse_day(params["from"][0], "from") if "from" in params else None
+    end = parse_day(params["to"][0], "to") if "to" in params else None
+    return venue, start, end
+
+def match_day(fix):
+    day = to_dt(fix["date"], fix["time"])
+    return day.date() if isinstance(day, datetime) else day
+
+def select(fixtures, team, venue=None, start=None, end=None):
+    """Filtr DOM/WYJAZD i okna dat (włącznie); wynik posortowany jak w plikach kalendarzy"""
+    selected = []
+    for fix in fixtures:
+        if venue and (venue == "DOM") != is_home(fix, team):
+            continue
+        if start or end:
+            day = match_day(fix)
+            if (start and day < start) or (end and day > end):
+                continue
+        selected.append(fix)
+    return sorted(selected, key=lambda f: (sort_key(f), f.get("id") or ""))
+
+def render(fixtures, team):
+    """Treść ICS + silny ETag + wersja gzip (gdy warto)"""
+    body = "".join(iter_calendar(fixtures, team)).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return etag, body, compressed
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (t.strip() for t in header.split(","))
+
+class CalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ksw-ics"
+    # Ustawiane przez make_server
+    index = None
+    cache = None
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def handle_request(self, send_body):
+        url = urlparse(self.path)
+        try:
+            if url.path in ("/", "/index.html"):
+                self.send_index(send_body)
+            elif url.path.startswith("/teams/") and url.path.endswith(".ics"):
+                team = unquote(url.path[len("/teams/"):-len(".ics")])
+                self.send_calendar(team, url.query, send_body)
+            else:
+                self.send_text(404, "not found\n", send_body)
+        except BadRequest as e:
+            self.send_text(400, f"{e}\n", send_body)
+
+    def send_calendar(self, team, query, send_body):
+        venue, start, end = calendar_params(query)
+        params = (team.lower(), venue, start, end)
+        entry = self.cache.get((self.index.version, *params))
+        if entry is None:
+            version, fixtures = self.index.fixtures(team)
+            if not fixtures:
+                self.send_text(404, f"unknown team: {team}\n", send_body)
+                return
+            entry = render(select(fixtures, team, venue, start, end), team)
+            self.cache.put((version, *params), entry)
+        etag, body, compressed = entry
+
+        # Różne kodowania to różne reprezentacje -> różne silne ETagi
+        use_gzip = compressed is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            etag, body = etag[:-1] + '.gz"', compressed
+        headers = {
+            "Content-Type": "text/calendar; charset=utf-8",
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={SERVE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        self.send_bytes(200, body, headers, send_body)
+
+    def send_index(self, send_body):
+        items = "".join(f'<li><a href="/teams/{quote(name)}.ics">{html.escape(name)}</a></li>'
+                        for name in self.index.teams)
+        page = ('<!doctype html><html><head><meta charset="utf-8"><title>KSW ICS</title></head>'
+                f"<body><ul>{items}</ul></body></html>")
+        self.send_bytes(200, page.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8"}, send_body)
+
+    def send_text(self, status, text, send_body):
+        self.send_bytes(status, text.encode("utf-8"), {"Content-Type": "text/plain; charset=utf-8"}, send_body)
+
+    def send_bytes(self, status, body, headers, send_body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def make_server(index, host=SERVE_HOST, port=SERVE_PORT, cache=None):
+    handler = type("Handler", (CalendarHandler,), {"index": index, "cache": cache or RenderCache()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def refresh_loop(index, stop, interval=SERVE_REFRESH):
+    while not stop.wait(interval):
+        try:
+            if index.refresh():
+                print(f"Fixture index updated (version {index.version})")
+        except Exception as e:
+            print(f"ERROR refreshing fixture index: {e}")
+
+def run_server(config_path=None, host=SERVE_HOST, port=SERVE_PORT):
+    groups = list(group_entries(load_batch_config(config_path))) if config_path else [GROUP]
+    index = FixtureIndex(groups)
+    index.refresh()
+    server = make_server(index, host, port)
+    stop = threading.Event()
+    threading.Thread(target=refresh_loop, args=(index, stop), daemon=True).start()
+    print(f"Serving {len(index.teams)} teams from {len(groups)} groups on http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        sys.exit(f"usage: {sys.argv[0]} [CONFIG]")
+    run_server(sys.argv[1] if len(sys.argv) == 2 else None)
@@ -0,0 +1,210 @@
+"""Strumieniowy zapis kalendarza RFC 5545 prosto ze słowników fixtures.
+
+Zamiennik budowania obiektów ``ics.Event`` dla dużych kalendarzy: każdy
+mecz to kilka linii tekstu, bez pośrednich obiektów. Te same mecze z tym samym
+DTSTAMP dają ten sam tekst (stałe UID i kolejność), czasy są zapisywane
+lokalnie z ``TZID`` i dołączonym VTIMEZONE.
+
+DTSTAMP to moment ostatniej zmiany meczu z pliku stanu (fixture_state), więc
+zmienia się tylko razem z meczem; bez stanu — stały ``DEFAULT_DTSTAMP``.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from dateutil import tz
+
+from scrape_to_ics import (
+    ALARM_TIME, EVENT_DURATION_HOURS, TIMEZONE, TZ,
+    fixture_uid, is_home, monday_alarm_for, to_dt,
+)
+
+PRODID = "-//KSW ICS scraper//laczynaspilka.pl//PL"
+CRLF = "\r\n"
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+# Kalendarze bez stanu (serwer, wzorzec) nie znają chwili zmiany meczu
+DEFAULT_DTSTAMP = "20000101T000000Z"
+
+def escape_text(value):
+    """Escapowanie wartości TEXT (RFC 5545, 3.3.11)"""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def fold(line):
+    """Zawija linię do 75 oktetów, nie rozcinając znaków UTF-8 (RFC 5545, 3.1)"""
+    # Znak UTF-8 ma do 4 bajtów, więc 18 znaków zawsze mieści się w 75 oktetach;
+    # w ASCII znak to oktet, więc kodowanie nie jest potrzebne
+    if len(line) <= 18 or (len(line) <= 75 and line.isascii()) or len(line.encode("utf-8")) <= 75:
+        return line + CRLF
+    parts, current, size, limit = [], [], 0, 75
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > limit:
+            parts.append("".join(current))
+            # Linia kontynuacji zaczyna się spacją, która też zajmuje oktet
+            current, size, limit = [], 0, 74
+        current.append(ch)
+        size += n
+    parts.append("".join(current))
+    return (CRLF + " ").join(parts) + CRLF
+
+def format_duration(delta):
+    """timedelta -> wartość DURATION, np. -P4DT15H albo PT2H"""
+    seconds = int(delta.total_seconds())
+    sign = "-" if seconds < 0 else ""
+    seconds = abs(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    out = f"{sign}P"
+    if days:
+        out += f"{days}D"
+    if hours or minutes or seconds or not days:
+        out += "T"
+        if hours:
+            out += f"{hours}H"
+        if minutes:
+            out += f"{minutes}M"
+        if seconds or not (hours or minutes):
+            out += f"{seconds}S"
+    return out
+
+def _utc_offset(minutes_delta):
+    total = int(minutes_delta.total_seconds() // 60)
+    sign = "-" if total < 0 else "+"
+    hh, mm = divmod(abs(total), 60)
+    return f"{sign}{hh:02d}{mm:02d}"
+
+def _transitions(tzinfo, year):
+    """Zwraca listę (lokalny czas zmiany wg starego offsetu, offset przed, offset po)"""
+    out = []
+    moment = datetime(year, 1, 1, tzinfo=tz.UTC)
+    offset = tzinfo.utcoffset(moment.astimezone(tzinfo))
+    while moment.year == year:
+        moment += timedelta(hours=1)
+        new_offset = tzinfo.utcoffset(moment.astimezone(tzinfo))
+        if new_offset != offset:
+            out.append(((moment + offset).replace(tzinfo=None), offset, new_offset))
+            offset = new_offset
+    return out
+
+def _nth_weekday(year, month, weekday, nth):
+    if nth > 0:
+        first = datetime(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+    last = datetime(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+@lru_cache(maxsize=None)
+def vtimezone_lines(tzid=TIMEZONE, year=2024):
+    """Buduje VTIMEZONE z regułami RRULE odczytanymi z przejść w roku ``year``"""
+    tzinfo = tz.gettz(tzid)
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{tzid}"]
+    transitions = _transitions(tzinfo, year)
+    if not transitions:
+        offset = _utc_offset(tzinfo.utcoffset(datetime(year, 1, 1)))
+        lines += ["BEGIN:STANDARD", "DTSTART:19700101T000000",
+                  f"TZOFFSETFROM:{offset}", f"TZOFFSETTO:{offset}", "END:STANDARD"]
+    for local, before, after in transitions:
+        kind = "DAYLIGHT" if after > before else "STANDARD"
+        last = (local + timedelta(days=7)).month != local.month
+        nth = -1 if last else (local.day - 1) // 7 + 1
+        start = _nth_weekday(1970, local.month, local.weekday(), nth)
+        lines += [
+            f"BEGIN:{kind}",
+            f"DTSTART:{start:%Y%m%d}T{local:%H%M%S}",
+            f"RRULE:FREQ=YEARLY;BYMONTH={local.month};BYDAY={nth}{WEEKDAYS[local.weekday()]}",
+            f"TZOFFSETFROM:{_utc_offset(before)}",
+            f"TZOFFSETTO:{_utc_offset(after)}",
+            f"TZNAME:{tzinfo.tzname(local + timedelta(days=1))}",
+            f"END:{kind}",
+        ]
+    lines.append("END:VTIMEZONE")
+    return tuple(lines)
+
+@lru_cache(maxsize=8192)
+def _timing(date_s, time_s):
+    """Linie DTSTART/DURATION|DTEND — z samego tekstu daty, bez strefy czasowej"""
+    day = f"{date_s[6:10]}{date_s[3:5]}{date_s[0:2]}"
+    if time_s:
+        hh, mm = time_s.split(":")
+        return (f"DTSTART;TZID={TIMEZONE}:{day}T{int(hh):02d}{int(mm):02d}00",
+                f"DURATION:{format_duration(timedelta(hours=EVENT_DURATION_HOURS))}")
+    next_day = datetime.strptime(day, "%Y%m%d") + timedelta(days=1)
+    return f"DTSTART;VALUE=DATE:{day}", f"DTEND;VALUE=DATE:{next_day:%Y%m%d}"
+
+@lru_cache(maxsize=8192)
+def _trigger(date_s, time_s):
+    """Przesunięcie alarmu poniedziałkowego (s) — w sezonie daty często się powtarzają"""
+    start = to_dt(date_s, time_s)
+    match_dt = start if time_s else datetime.combine(start, datetime.min.time()).replace(tzinfo=TZ)
+    return int((monday_alarm_for(match_dt, ALARM_TIME) - match_dt).total_seconds())
+
+@lru_cache(maxsize=1024)
+def _trigger_value(seconds):
+    """Sekundy -> wartość TRIGGER; przesunięć alarmu jest w sezonie kilkanaście"""
+    return format_duration(timedelta(seconds=int(seconds)))
+
+def format_dtstamp(moment):
+    """datetime (aware) -> wartość DTSTAMP w UTC"""
+    return f"{moment.astimezone(tz.UTC):%Y%m%dT%H%M%SZ}"
+
+def vevent_lines(fix, team=None, sequence=0, dtstamp=DEFAULT_DTSTAMP, home=None, trigger=None):
+    """Linie jednego VEVENT (z VALARM) dla meczu; ``dtstamp`` — chwila ostatniej zmiany
+
+    ``home`` i ``trigger`` (przesunięcie alarmu w sekundach) mogą przyjść
+    policzone hurtowo z fixture_table; bez nich liczone są dla tego meczu.
+    """
+    if home is None:
+        home = is_home(fix, team)
+    if trigger is None:
+        trigger = _trigger(fix["date"], fix["time"])
+    opponent = fix["away"] if home else fix["home"]
+    summary = escape_text(f"{opponent} – {'DOM' if home else 'WYJAZD'}")
+    description = escape_text("Wyślij bilety do druku" if home
+                              else "Ustal transport, obiad po drodze, pizza po meczu")
+    timing = _timing(fix["date"], fix["time"])
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{fixture_uid(fix, team)}",
+        f"DTSTAMP:{dtstamp}",
+        *timing,
+        f"SUMMARY:{summary}",
+        f"DESCRIPTION:{description}",
+    ]
+    if fix.get("stadium"):
+        lines.append(f"LOCATION:{escape_text(str(fix['stadium']))}")
+    if sequence:
+        lines.append(f"SEQUENCE:{sequence}")
+    lines += [
+        "BEGIN:VALARM",
+        "ACTION:DISPLAY",
+        f"DESCRIPTION:{summary}",
+        f"TRIGGER:{_trigger_value(trigger)}",
+        "END:VALARM",
+        "END:VEVENT",
+    ]
+    return lines
+
+def serialize_vevent(fix, team=None, sequence=0, dtstamp=DEFAULT_DTSTAMP, home=None, trigger=None):
+    """Gotowy (zawinięty) blok VEVENT zakończony CRLF"""
+    return "".join(fold(line) for line in vevent_lines(fix, team, sequence, dtstamp, home, trigger))
+
+def calendar_header(tzid=TIMEZONE):
+    return "".join(fold(line) for line in
+                   ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+                    *vtimezone_lines(tzid)])
+
+CALENDAR_FOOTER = "END:VCALENDAR" + CRLF
+
+def iter_calendar(fixtures, team=None):
+    """Generator kolejnych fragmentów pliku ICS (nagłówek, VEVENTy, stopka)"""
+    yield calendar_header()
+    for fix in fixtures:
+        yield serialize_vevent(fix, team)
+    yield CALENDAR_FOOTER
+
+def write_calendar_stream(fixtures, fp, team=None):
+    for chunk in iter_calendar(fixtures, team):
+        fp.write(chunk)
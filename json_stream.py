@@ -0,0 +1,104 @@
+"""Strumieniowe parsowanie tablicy meczów z comp-api.
+
+Odpowiedź ``plays/<group>/matches`` to jedna tablica JSON. Zamiast
+``response.json()`` na całej treści dekodujemy ją element po elemencie
+(``json.JSONDecoder.raw_decode``) z kolejnych kawałków odczytanych z gniazda.
+W pamięci jest naraz najwyżej jeden kawałek i jeden niedokończony mecz,
+a z każdego meczu zostają tylko pola potrzebne do kalendarza.
+"""
+
+import codecs, json
+
+CHUNK_SIZE = 64 * 1024
+# Pola meczu, z których korzysta match_to_fixture()
+MATCH_FIELDS = ("id", "dateTime", "stadium", "state", "queue")
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+def decode_chunks(chunks, encoding="utf-8"):
+    """bytes -> str kawałkami (znak wielobajtowy może być przecięty granicą kawałka)"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def iter_array(chunks):
+    """Generator elementów tablicy JSON najwyższego poziomu z kawałków str
+
+    Rzuca ValueError (json.JSONDecodeError), gdy treść nie jest poprawną tablicą.
+    """
+    chunks = iter(chunks)
+    buf, pos, eof = "", 0, False
+    state = "start"  # start -> first -> (value -> sep)* -> end
+
+    def refill():
+        nonlocal buf, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    while True:
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        if pos == len(buf):
+            if eof or not refill():
+                break
+            continue
+        c = buf[pos]
+        if state == "start":
+            if c != "[":
+                raise json.JSONDecodeError("Expected '['", buf, pos)
+            pos += 1
+            state = "first"
+        elif state in ("first", "value"):
+            if c == "]" and state == "first":
+                pos += 1
+                state = "end"
+                continue
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element urwany na granicy kawałka — dokładamy dane i dekodujemy od nowa
+                if eof or not refill():
+                    raise
+                continue
+            if end == len(buf) and not eof and refill():
+                # Liczba albo literał na końcu bufora może mieć ciąg dalszy
+                continue
+            pos = end
+            state = "sep"
+            yield value
+        elif state == "sep":
+            if c == ",":
+                state = "value"
+            elif c == "]":
+                state = "end"
+            else:
+                raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+            pos += 1
+        else:
+            raise json.JSONDecodeError("Extra data", buf, pos)
+
+    if state != "end":
+        raise json.JSONDecodeError("Unterminated array", buf, len(buf))
+
+def slim_match(match):
+    """Zostawia z meczu API tylko pola używane przy budowaniu kalendarza"""
+    slim = {key: match[key] for key in MATCH_FIELDS if key in match}
+    for side in ("host", "guest"):
+        slim[side] = {"name": (match.get(side) or {}).get("name", "")}
+    return slim
+
+def iter_matches(chunks):
+    """Odchudzone mecze z kawałków bytes odpowiedzi ``plays/<group>/matches``"""
+    for match in iter_array(decode_chunks(chunks)):
+        if isinstance(match, dict):
+            yield slim_match(match)
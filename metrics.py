@@ -0,0 +1,98 @@
+"""Pomiary etapów przebiegu: czasy, bajty, trafienia cache, ponowienia.
+
+Etapy (``token``, ``fetch``, ``decode``, ``filter``, ``build_ics``, ``serialize``,
+``write``, ...) mierzy ``with metrics.stage("fetch"):``, liczniki zwiększa
+``metrics.incr("bytes_transferred", n)``. Każdy zakończony etap to jedna linia
+JSON w ``METRICS_FILE`` (gdy ustawiony); ``flush()`` dopisuje linię podsumowania
+przebiegu i — przy ``METRICS_PROM_FILE`` — zapisuje plik tekstowy Prometheusa
+(np. dla textfile collectora node_exportera).
+"""
+
+import json, os, threading, time
+from contextlib import contextmanager
+
+METRICS_FILE = os.environ.get("METRICS_FILE", "")
+METRICS_PROM_FILE = os.environ.get("METRICS_PROM_FILE", "")
+PROM_PREFIX = "ksw_ics"
+
+_lock = threading.Lock()
+_stages = {}    # nazwa -> [łączny czas, liczba]
+_counters = {}  # nazwa -> wartość
+_config = {"jsonl": METRICS_FILE, "prom": METRICS_PROM_FILE}
+
+def configure(jsonl=None, prom=None):
+    """Nadpisuje ścieżki wyjść (np. z linii poleceń); None zostawia obecną"""
+    if jsonl is not None:
+        _config["jsonl"] = jsonl
+    if prom is not None:
+        _config["prom"] = prom
+
+def _emit(record):
+    path = _config["jsonl"]
+    if not path:
+        return
+    line = json.dumps({"ts": round(time.time(), 3), **record}, ensure_ascii=False)
+    with _lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+@contextmanager
+def stage(name, **labels):
+    """Mierzy czas bloku jako etap ``name`` (także gdy blok rzuci wyjątek)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            total = _stages.setdefault(name, [0.0, 0])
+            total[0] += elapsed
+            total[1] += 1
+        _emit({"event": "stage", "stage": name, "seconds": round(elapsed, 6), **labels})
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def snapshot():
+    """{"stages": {nazwa: {"seconds", "count"}}, "counters": {...}}"""
+    with _lock:
+        return {
+            "stages": {k: {"seconds": round(v[0], 6), "count": v[1]} for k, v in _stages.items()},
+            "counters": dict(_counters),
+        }
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+def prometheus_text(snap=None):
+    snap = snap or snapshot()
+    lines = [
+        f"# HELP {PROM_PREFIX}_stage_seconds_total Czas etapów przebiegu",
+        f"# TYPE {PROM_PREFIX}_stage_seconds_total counter",
+    ]
+    for name, s in sorted(snap["stages"].items()):
+        lines.append(f'{PROM_PREFIX}_stage_seconds_total{{stage="{name}"}} {s["seconds"]}')
+    lines += [f"# TYPE {PROM_PREFIX}_stage_runs_total counter"]
+    for name, s in sorted(snap["stages"].items()):
+        lines.append(f'{PROM_PREFIX}_stage_runs_total{{stage="{name}"}} {s["count"]}')
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f"# TYPE {PROM_PREFIX}_{name}_total counter")
+        lines.append(f"{PROM_PREFIX}_{name}_total {value}")
+    lines.append(f"# TYPE {PROM_PREFIX}_last_run_timestamp_seconds gauge")
+    lines.append(f"{PROM_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+    return "\n".join(lines) + "\n"
+
+def flush(**labels):
+    """Linia podsumowania przebiegu w JSON lines i plik Prometheusa (gdy skonfigurowane)"""
+    snap = snapshot()
+    _emit({"event": "run", **labels, **snap})
+    path = _config["prom"]
+    if path:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(snap))
+        os.replace(tmp, path)
+    return snap
@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 
 import re
-from requests_html import HTMLSession
+import browser_pool
 
 URL = "https://www.laczynaspilka.pl/rozgrywki?season=e9d66181-d03e-4bb3-b889-4da848f4831d&leagueGroup=43da7ba1-b751-4295-814b-24bd37fd2d45&leagueId=5cc45e5f-744b-428c-b8af-cdefca38de29&enumType=Play&group=e5bc0d4f-1bc4-40f5-92f9-e55c859b5166&isAdvanceMode=false&genderType=Male"
 
 print("Getting rendered content...")
-session = HTMLSession()
-response = session.get(URL, timeout=30)
-response.html.render(timeout=10, wait=1)  # Shorter wait time
-html = response.html.html
+# Przeglądarka z puli (ta sama co przy tokenie); czekamy, aż pojawią się daty meczów
+html = browser_pool.render_page(URL, lambda page: page if re.search(r'\d{2}\.\d{2}\.\d{4}', page) else None,
+                                timeout=10) or ""
 
 print(f"Rendered content length: {len(html)}")
 
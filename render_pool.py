@@ -0,0 +1,58 @@
+"""Równoległe renderowanie wielu kalendarzy w puli procesów.
+
+Serializacja kalendarza to czysty Python, więc wątki nic nie dają — przy
+eksportach całych województw (tysiące drużyn) kalendarze są rozdzielane między
+procesy. Do procesów trafiają zwarte paczki: nazwy pól raz na kalendarz
+i mecze jako krotki, a nie słowniki ani obiekty ``ics.Event``. Każdy proces
+łata swoje pliki przez ``fixture_state.update_calendar`` (zapis atomowy).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", str(os.cpu_count() or 1)))
+# Kalendarze na jedno zadanie w puli — mniej zadań to mniej komunikacji między procesami
+RENDER_CHUNK = int(os.environ.get("RENDER_CHUNK", "16"))
+# Poniżej tylu kalendarzy start puli kosztuje więcej niż zysk
+RENDER_PARALLEL_MIN = int(os.environ.get("RENDER_PARALLEL_MIN", "8"))
+
+def pack(fixtures):
+    """(nazwy pól, krotki) gdy wszystkie mecze mają te same pola; inaczej (None, słowniki)"""
+    if not fixtures:
+        return (), []
+    keys = tuple(fixtures[0])
+    if all(tuple(f) == keys for f in fixtures):
+        return keys, [tuple(f.values()) for f in fixtures]
+    return None, fixtures
+
+def unpack(keys, rows):
+    if keys is None:
+        return rows
+    return [dict(zip(keys, row)) for row in rows]
+
+def render_batch(batch, now=None):
+    """Wykonywane w procesie puli: [(team, out, keys, rows, columns)] -> [(out, added, changed, removed)]"""
+    from fixture_state import update_calendar
+    results = []
+    for team, out, keys, rows, columns in batch:
+        added, changed, removed = update_calendar(unpack(keys, rows), out, team, now=now, columns=columns)
+        results.append((out, len(added), len(changed), len(removed)))
+    return results
+
+def render_calendars(jobs, workers=RENDER_WORKERS, chunk=RENDER_CHUNK, now=None):
+    """Renderuje kalendarze [(team, out, fixtures[, columns])]; zwraca [(out, added, changed, removed)]
+
+    ``columns`` to kolumny policzone hurtowo (fixture_table.for_team_with_columns).
+    ``now`` — chwila zmiany (DTSTAMP) dla nowych i zmienionych meczów; domyślnie teraz.
+    Kolejność wyników odpowiada kolejności ``jobs``.
+    """
+    packed = [(team, out, *pack(fixtures), columns[0] if columns else None)
+              for team, out, fixtures, *columns in jobs]
+    if workers <= 1 or len(jobs) < RENDER_PARALLEL_MIN:
+        return render_batch(packed, now)
+    # Co najmniej kilka paczek na proces, żeby wolniejsze paczki się wyrównały
+    chunk = max(1, min(chunk, len(packed) // (workers * 4)))
+    batches = [packed[i:i + chunk] for i in range(0, len(packed), chunk)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        return [r for results in pool.map(partial(render_batch, now=now), batches) for r in results]
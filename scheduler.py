@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Tryb rezydentny: jeden proces odpytuje ligi w pętli zamiast zimnych startów z crona.
+
+Sesja HTTP (http_fetch), cache tokenu, cache odpowiedzi i stan kalendarzy
+zostają w procesie między cyklami. Każda grupa rozgrywkowa ma własny termin
+następnego pobrania, wyliczany z jej ostatniej listy meczów:
+
+- ``POLL_MATCHDAY`` — mecz w ciągu ``MATCHDAY_WINDOW_HOURS`` (przed lub po),
+- ``POLL_UNSCHEDULED`` — w najbliższych ``UPCOMING_DAYS`` dniach jest mecz bez godziny
+  albo ze stanem ``Unscheduled``,
+- ``POLL_SEASON`` — sezon trwa (najbliższy mecz w ciągu ``UPCOMING_DAYS`` dni),
+- ``POLL_OFFSEASON`` — przerwa między sezonami.
+
+Do każdego terminu dochodzi losowe przesunięcie (``POLL_JITTER`` okresu), żeby ligi
+nie odpytywały API w tej samej chwili. Cykl pobiera tylko grupy, którym minął termin,
+warunkowo (ETag/Last-Modified) — bez zmian kończy się na odpowiedzi 304.
+
+Użycie: ``python scheduler.py [CONFIG]`` albo ``python scrape_to_ics.py --schedule [--batch CONFIG]``
+"""
+
+import os, random, signal, sys, threading, time
+from datetime import datetime, timedelta
+
+import metrics
+from atomic_output import locked
+
+from batch import (
+    BATCH_STATE_FILE, group_entries, load_batch_config, load_state, save_state,
+    seen_for, update_group,
+)
+from scrape_to_ics import (
+    GROUP, NOT_MODIFIED, OUT, TEAM, TZ, fetch_matches_many, match_to_fixture, to_dt,
+)
+
+POLL_MATCHDAY = float(os.environ.get("POLL_MATCHDAY", str(15 * 60)))
+POLL_UNSCHEDULED = float(os.environ.get("POLL_UNSCHEDULED", str(60 * 60)))
+POLL_SEASON = float(os.environ.get("POLL_SEASON", str(6 * 60 * 60)))
+POLL_OFFSEASON = float(os.environ.get("POLL_OFFSEASON", str(24 * 60 * 60)))
+# Po błędzie API (pusta lista) ponawiamy wcześniej, ale nie od razu
+POLL_ERROR = float(os.environ.get("POLL_ERROR", str(30 * 60)))
+POLL_JITTER = float(os.environ.get("POLL_JITTER", "0.1"))
+MATCHDAY_WINDOW_HOURS = float(os.environ.get("MATCHDAY_WINDOW_HOURS", "36"))
+UPCOMING_DAYS = int(os.environ.get("UPCOMING_DAYS", "21"))
+
+def kickoff(fixture):
+    """Początek meczu (aware datetime); mecz bez godziny liczymy od północy"""
+    start = to_dt(fixture["date"], fixture["time"])
+    if isinstance(start, datetime):
+        return start
+    return datetime(start.year, start.month, start.day, tzinfo=TZ)
+
+def is_unscheduled(fixture):
+    return not fixture["time"] or str(fixture.get("state") or "").lower() == "unscheduled"
+
+def poll_interval(matches, now=None):
+    """Okres odpytywania grupy (s) na podstawie jej listy meczów z API"""
+    now = now or datetime.now(TZ)
+    window = timedelta(hours=MATCHDAY_WINDOW_HOURS)
+    upcoming = now + timedelta(days=UPCOMING_DAYS)
+    in_season = unscheduled = False
+    for match in matches:
+        fixture = match_to_fixture(match)
+        if fixture is None:
+            continue
+        start = kickoff(fixture)
+        if abs(start - now) <= window:
+            return POLL_MATCHDAY
+        if now <= start <= upcoming:
+            in_season = True
+            unscheduled = unscheduled or is_unscheduled(fixture)
+    if unscheduled:
+        return POLL_UNSCHEDULED
+    return POLL_SEASON if in_season else POLL_OFFSEASON
+
+def with_jitter(interval, rng=random):
+    return interval * (1 + rng.uniform(0, POLL_JITTER))
+
+class Scheduler:
+    """Terminy pobrań i ostatnie listy meczów poszczególnych grup"""
+
+    def __init__(self, by_group, state_path=BATCH_STATE_FILE, rng=None):
+        self.by_group = by_group
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.rng = rng or random.Random()
+        self.matches = {}
+        # Pierwszy cykl pobiera wszystkie grupy razem (równolegle), dalej rozjeżdżają się o jitter
+        self.due = dict.fromkeys(by_group, time.time())
+
+    def next_due(self):
+        return min(self.due.values())
+
+    def tick(self, now=None):
+        """Pobiera grupy, którym minął termin; zwraca liczbę zmienionych kalendarzy"""
+        now = now or time.time()
+        due = [g for g, t in self.due.items() if t <= now]
+        if not due:
+            return 0
+        # NOT_MODIFIED tylko dla grup ze znaną listą, których kalendarze powstały z tej
+        # samej wersji listy (walidator w stanie); 304 bez tego oddaje treść z cache
+        known = [g for g in due if g in self.matches]
+        validators = {}
+        results = fetch_matches_many(due, seen_for(self.by_group, self.state, known), validators)
+
+        updated = 0
+        with locked(self.state_path):
+            # Stan mógł zmienić przebieg wsadowy uruchomiony obok — czytamy go pod blokadą
+            self.state = load_state(self.state_path)
+            for group in due:
+                updated += update_group(group, self.by_group[group], results[group], self.state,
+                                        validators.get(group))
+            # Także bez zmian w kalendarzach: nowe walidatory (write_atomic pominie ten sam stan)
+            save_state(self.state, self.state_path)
+        for group in due:
+            matches = results[group]
+            if matches is NOT_MODIFIED:
+                interval = poll_interval(self.matches[group])
+            elif matches:
+                self.matches[group] = matches
+                interval = poll_interval(matches)
+            else:
+                interval = POLL_ERROR
+            self.due[group] = time.time() + with_jitter(interval, self.rng)
+            print(f"Group {group}: next poll in {(self.due[group] - time.time()) / 60:.0f} min")
+        # Liczniki są narastające od startu demona
+        metrics.flush(mode="schedule", groups=len(due), updated=updated)
+        return updated
+
+def single_team_groups():
+    """Konfiguracja trybu jednej drużyny (TEAM_NAME/OUTPUT_ICS) w kształcie trybu wsadowego"""
+    return group_entries([{"team": TEAM, "group": GROUP, "output": OUT}])
+
+def run_scheduler(config_path=None, state_path=BATCH_STATE_FILE):
+    by_group = group_entries(load_batch_config(config_path)) if config_path else single_team_groups()
+    scheduler = Scheduler(by_group, state_path)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    print(f"Scheduler: {sum(len(e) for e in by_group.values())} teams in {len(by_group)} competition groups")
+    while not stop.is_set():
+        try:
+            scheduler.tick()
+        except Exception as e:
+            # Pojedynczy nieudany cykl nie może zatrzymać demona
+            print(f"ERROR in scheduler tick: {e}")
+            for group in scheduler.due:
+                scheduler.due[group] = max(scheduler.due[group], time.time() + POLL_ERROR)
+        stop.wait(max(0, scheduler.next_due() - time.time()))
+    print("Scheduler stopped")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        sys.exit(f"usage: {sys.argv[0]} [CONFIG]")
+    run_scheduler(sys.argv[1] if len(sys.argv) == 2 else None)
@@ -1,10 +1,13 @@
-import json, os, re, hashlib
+import argparse, json, os, re, hashlib, time
 from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
 from dateutil import tz
-from ics import Calendar, Event, DisplayAlarm
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import http_cache, metrics
+from json_stream import CHUNK_SIZE, iter_matches
+from team_match import closeness, matcher, resolve_names
+from token_cache import cached_token, get_token, strip_bearer
+# selenium, ics i requests (http_fetch) są importowane przy pierwszym użyciu:
+# zwykły przebieg (200 albo 304 z API) nie potrzebuje przeglądarki ani ics.py
 
 # === CONFIG ===
 URL = os.environ.get("FIXTURES_URL", "https://www.laczynaspilka.pl/rozgrywki?season=e9d66181-d03e-4bb3-b889-4da848f4831d&leagueGroup=43da7ba1-b751-4295-814b-24bd37fd2d45&leagueId=5cc45e5f-744b-428c-b8af-cdefca38de29&enumType=Play&group=e5bc0d4f-1bc4-40f5-92f9-e55c859b5166&isAdvanceMode=false&genderType=Male")
@@ -14,46 +17,52 @@ STATE_FILE = os.environ.get("STATE_FILE", ".state_hash.txt")
 EVENT_DURATION_HOURS = float(os.environ.get("EVENT_DURATION_HOURS", "2"))
 ALARM_TIME = os.environ.get("ALARM_TIME", "09:00")  # Poniedziałek 09:00
 TIMEZONE = os.environ.get("TIMEZONE", "Europe/Warsaw")
+STREAM_MATCHES = os.environ.get("STREAM_MATCHES", "0") == "1"
+
+API_BASE = os.environ.get("API_BASE", "https://comp-api.laczynaspilka.pl/api/bus/competition/v1")
+API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://www.laczynaspilka.pl/',
+    'Origin': 'https://www.laczynaspilka.pl'
+}
 
 TZ = tz.gettz(TIMEZONE)
 
+def group_from_url(url):
+    """Wyciąga identyfikator grupy rozgrywkowej z adresu strony rozgrywek"""
+    return parse_qs(urlparse(url).query).get("group", [""])[0]
+
+GROUP = os.environ.get("COMPETITION_GROUP") or group_from_url(URL)
+# Bez jawnie podanej grupy drużynę wyszukujemy w indeksie rozgrywek (competition_index.py)
+GROUP_PINNED = bool(os.environ.get("COMPETITION_GROUP") or os.environ.get("FIXTURES_URL"))
+
+def matches_url(group):
+    return f"{API_BASE}/plays/{group}/matches"
+
 def normalize_space(s: str) -> str:
     return re.sub(r"\s+", " ", s or "").strip()
 
-def parse_fixture_rows(html):
+def parse_fixture_rows(html, team=None):
+    """Wyciąga mecze drużyny z wyrenderowanego HTML (str albo iterowalne kawałki str)"""
+    from html_fixtures import iter_fixtures, iter_text_chunks
     print("Parsing HTML content...")
-    # Wzorzec: "Gospodarz – Gość ... dd.mm.rrrr, HH:MM" (godzina może nie wystąpić)
-    pattern = re.compile(
-        r"(?P<home>[^<>\n–-]{3,}?)\s*[–-]\s*(?P<away>[^<>\n]{3,}?)"
-        r".{0,200}?"
-        r"(?P<date>\d{2}\.\d{2}\.\d{4})"
-        r"(?:\s*,\s*(?P<time>\d{2}:\d{2}))?",
-        re.S
-    )
-    fixtures = []
-    matches_found = 0
-    for m in pattern.finditer(html):
-        matches_found += 1
-        home = normalize_space(m.group("home"))
-        away = normalize_space(m.group("away"))
-        date_s = m.group("date")
-        time_s = m.group("time")
-        
-        if matches_found <= 5:  # Debug: pokaż pierwsze 5 meczów
-            print(f"Found match: {home} - {away} on {date_s} at {time_s}")
-            
-        if TEAM.lower() not in (home.lower() + " " + away.lower()):
-            continue
-        fixtures.append({"home": home, "away": away, "date": date_s, "time": time_s})
-        
-    print(f"Total matches found: {matches_found}, Team matches: {len(fixtures)}")
-    
-    uniq, seen = [], set()
-    for f in fixtures:
-        key = (f["home"], f["away"], f["date"], f["time"] or "")
-        if key not in seen:
-            seen.add(key)
-            uniq.append(f)
+    is_team = matcher(team or TEAM)
+    chunks = iter_text_chunks(html) if isinstance(html, str) else html
+
+    uniq, seen, matches_found = [], set(), 0
+    with metrics.stage("parse_html"):
+        for f in iter_fixtures(chunks):
+            matches_found += 1
+            if not (is_team(f["home"]) or is_team(f["away"])):
+                continue
+            k = (f["home"], f["away"], f["date"], f["time"] or "")
+            if k not in seen:
+                seen.add(k)
+                uniq.append(f)
+        uniq = resolve_candidates(uniq, team or TEAM)
+
+    print(f"Total matches found: {matches_found}, Team matches: {len(uniq)}")
     return uniq
 
 def to_dt(date_s, time_s):
@@ -66,240 +75,641 @@ def to_dt(date_s, time_s):
     # Dla meczów całodniowych zwróć tylko datę
     return d
 
-def is_home(fix):
-    return fix["home"].lower() == TEAM.lower()
+def is_home(fix, team=None):
+    """Czy drużyna gra u siebie: gospodarz jest jej bliższy niż gość (najpierw ten sam klucz nazwy)"""
+    team = team or TEAM
+    return closeness(team, fix["home"]) >= closeness(team, fix["away"])
 
 def monday_alarm_for(dt_local, alarm_time="09:00"):
     hh, mm = map(int, alarm_time.split(":"))
     monday = dt_local.date() - timedelta(days=dt_local.weekday())
     return datetime(monday.year, monday.month, monday.day, hh, mm, tzinfo=TZ)
 
-def build_ics(fixtures):
-    cal = Calendar()
-    for f in fixtures:
-        dt_local = to_dt(f["date"], f["time"])
-        home = is_home(f)
-        opponent = f["away"] if home else f["home"]
-        place = "DOM" if home else "WYJAZD"
-
-        ev = Event()
-        ev.name = f"{opponent} – {place}"
-
-        if f["time"]:
-            # Mecz z konkretną godziną
-            ev.begin = dt_local
-            ev.duration = {"hours": EVENT_DURATION_HOURS}
-            
-            # Alarm w poniedziałek 09:00 (tydzień meczu)
-            alarm_dt = monday_alarm_for(dt_local, ALARM_TIME)
-            delta = alarm_dt - dt_local
-            ev.alarms.append(DisplayAlarm(trigger=delta))
+def fixture_key(fix):
+    """Stabilna tożsamość meczu: id z API, a bez niego gospodarz/gość/kolejka"""
+    if fix.get("id"):
+        return f"id:{fix['id']}"
+    return f"{fix['home']}|{fix['away']}|{fix.get('queue') or ''}"
+
+def fixture_uid(fix, team=None):
+    """Deterministyczny UID wydarzenia (ten sam mecz w kalendarzu drużyny = ten sam UID)"""
+    digest = hashlib.sha1(f"{(team or TEAM).lower()}|{fixture_key(fix)}".encode("utf-8")).hexdigest()
+    return f"{digest}@ksw-ics-scraper"
+
+def make_event(f, team=None):
+    from ics import DisplayAlarm, Event
+    dt_local = to_dt(f["date"], f["time"])
+    home = is_home(f, team)
+    opponent = f["away"] if home else f["home"]
+    place = "DOM" if home else "WYJAZD"
+
+    ev = Event()
+    ev.name = f"{opponent} – {place}"
+    ev.uid = fixture_uid(f, team)
+
+    if f["time"]:
+        # Mecz z konkretną godziną
+        ev.begin = dt_local
+        ev.duration = {"hours": EVENT_DURATION_HOURS}
+
+        # Alarm w poniedziałek 09:00 (tydzień meczu)
+        alarm_dt = monday_alarm_for(dt_local, ALARM_TIME)
+        delta = alarm_dt - dt_local
+        ev.alarms.append(DisplayAlarm(trigger=delta))
+    else:
+        # Mecz całodniowy
+        ev.begin = dt_local  # dt_local to już date object
+        ev.make_all_day()
+
+        # Alarm w poniedziałek 09:00
+        match_datetime = datetime.combine(dt_local, datetime.min.time())
+        if hasattr(TZ, 'localize'):
+            match_datetime = TZ.localize(match_datetime)
         else:
-            # Mecz całodniowy
-            ev.begin = dt_local  # dt_local to już date object
-            ev.make_all_day()
-            
-            # Alarm w poniedziałek 09:00
-            match_datetime = datetime.combine(dt_local, datetime.min.time())
-            if hasattr(TZ, 'localize'):
-                match_datetime = TZ.localize(match_datetime)
-            else:
-                match_datetime = match_datetime.replace(tzinfo=TZ)
-            
-            alarm_dt = monday_alarm_for(match_datetime, ALARM_TIME)
-            delta = alarm_dt - match_datetime
-            ev.alarms.append(DisplayAlarm(trigger=delta))
+            match_datetime = match_datetime.replace(tzinfo=TZ)
+
+        alarm_dt = monday_alarm_for(match_datetime, ALARM_TIME)
+        delta = alarm_dt - match_datetime
+        ev.alarms.append(DisplayAlarm(trigger=delta))
 
-        ev.description = ("Wyślij bilety do druku" if home
-                          else "Ustal transport, obiad po drodze, pizza po meczu")
+    ev.description = ("Wyślij bilety do druku" if home
+                      else "Ustal transport, obiad po drodze, pizza po meczu")
+    return ev
 
-        cal.events.add(ev)
+def build_ics(fixtures, team=None):
+    from ics import Calendar
+    with metrics.stage("build_ics"):
+        cal = Calendar()
+        for f in fixtures:
+            cal.events.add(make_event(f, team))
     return cal
 
 def compute_hash(fixtures):
+    # sort_keys: mecze z API i odczytane z fixture_store mają różną kolejność kluczy
     payload = json.dumps(sorted(
         fixtures, key=lambda x: (x["date"], x.get("time") or "", x["home"], x["away"])
-    ), ensure_ascii=False)
+    ), ensure_ascii=False, sort_keys=True)
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-def get_auth_token_from_browser():
-    """Pobiera token autoryzacyjny z przeglądarki"""
-    print("Getting auth token from browser...")
-    
+TOKEN_CAPTURE_TIMEOUT = float(os.environ.get("TOKEN_CAPTURE_TIMEOUT", "20"))
+# Zasoby zbędne do przechwycenia tokenu — blokowane, żeby strona ładowała się szybciej
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+def browser_options():
+    from selenium.webdriver.chrome.options import Options
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    
-    driver = None
-    try:
-        driver = webdriver.Chrome(options=chrome_options)
-        print("Loading main page to get token...")
-        driver.get(URL)
-        
-        # Poczekaj chwilę na załadowanie
-        import time
-        time.sleep(3)
-        
-        # Spróbuj znaleźć token w localStorage, sessionStorage lub cookies
-        try:
-            # Sprawdź localStorage
-            local_storage = driver.execute_script("return window.localStorage;")
-            for key, value in local_storage.items():
-                if 'token' in key.lower() and value:
-                    print(f"Found token in localStorage: {key}")
-                    return value
-            
-            # Sprawdź sessionStorage
-            session_storage = driver.execute_script("return window.sessionStorage;")
-            for key, value in session_storage.items():
-                if 'token' in key.lower() and value:
-                    print(f"Found token in sessionStorage: {key}")
-                    return value
-                    
-        except Exception as e:
-            print(f"Error checking browser storage: {e}")
-        
-        # Spróbuj przechwycić token z network requests
-        logs = driver.get_log('performance')
-        for log in logs:
-            message = json.loads(log['message'])
-            if message['message']['method'] == 'Network.responseReceived':
-                url = message['message']['params']['response']['url']
-                if 'token' in url or 'auth' in url:
-                    print(f"Found potential token URL: {url}")
-        
+    # Nie czekaj na pełne załadowanie strony — czekamy na konkretne żądanie sieciowe
+    chrome_options.page_load_strategy = "none"
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+def authorization_from_event(raw):
+    """Zwraca nagłówek Authorization z wpisu logu performance (albo None)"""
+    # Tani filtr na surowym tekście, zanim zapłacimy za json.loads
+    if "comp-api" not in raw or "uthorization" not in raw:
         return None
-        
-    except Exception as e:
-        print(f"Error getting token from browser: {e}")
+    message = json.loads(raw)["message"]
+    method = message.get("method")
+    params = message.get("params", {})
+    if method == "Network.requestWillBeSent":
+        if "comp-api" not in params.get("request", {}).get("url", ""):
+            return None
+        headers = params["request"].get("headers", {})
+    elif method == "Network.requestWillBeSentExtraInfo":
+        headers = params.get("headers", {})
+    else:
         return None
-    finally:
-        if driver:
-            driver.quit()
+    for name, value in headers.items():
+        if name.lower() == "authorization" and value:
+            return value
+    return None
 
-def scrape_fixtures_with_api():
-    """Scrapuje mecze używając API endpoint"""
-    print("Using API endpoint for scraping...")
-    
-    # API endpoint znaleziony w Network tab
-    api_url = "https://comp-api.laczynaspilka.pl/api/bus/competition/v1/plays/e5bc0d4f-1bc4-40f5-92f9-e55c859b5166/matches"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Referer': 'https://www.laczynaspilka.pl/',
-        'Origin': 'https://www.laczynaspilka.pl'
-    }
-    
+def wait_for_auth_header(driver, timeout=TOKEN_CAPTURE_TIMEOUT):
+    """Czeka na pierwsze żądanie do comp-api z nagłówkiem Authorization"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # get_log zwraca tylko wpisy od poprzedniego wywołania
+        for entry in driver.get_log("performance"):
+            value = authorization_from_event(entry["message"])
+            if value:
+                return strip_bearer(value)
+        time.sleep(0.05)
+    return None
+
+def token_from_storage(driver):
+    """Szuka tokenu w localStorage/sessionStorage (zapasowa ścieżka)"""
+    for storage in ("localStorage", "sessionStorage"):
+        items = driver.execute_script(f"return Object.entries(window.{storage});")
+        for key, value in items:
+            if 'token' in key.lower() and value:
+                print(f"Found token in {storage}: {key}")
+                return value
+    return None
+
+def get_auth_token_from_browser():
+    """Pobiera token autoryzacyjny z przeglądarki (wypożyczonej z browser_pool)"""
+    print("Getting auth token from browser...")
+
+    started = time.perf_counter()
     try:
-        # Spróbuj najpierw bez tokenu
-        print("Trying without authorization token first...")
-        response = requests.get(api_url, headers=headers, timeout=30)
-        
-        if response.status_code == 401:
-            print("401 Unauthorized, trying to get new auth token from browser...")
-            token = get_auth_token_from_browser()
+        import browser_pool
+        with browser_pool.lease() as driver:
+            print("Loading main page to capture token...")
+            driver.get(URL)
+
+            token = wait_for_auth_header(driver)
             if token:
-                headers['Authorization'] = f'Bearer {token}'
-                print(f"Got new token, making API request...")
-                response = requests.get(api_url, headers=headers, timeout=30)
-            else:
-                print("Could not get auth token, API requires authentication")
-                return []
-        
-        if response.status_code != 200:
-            print(f"API returned status code: {response.status_code}")
+                print(f"Captured Authorization header in {time.perf_counter() - started:.2f}s")
+                return token
+
+            print(f"No Authorization header within {TOKEN_CAPTURE_TIMEOUT:.0f}s, checking browser storage...")
+            try:
+                token = token_from_storage(driver)
+            except Exception as e:
+                print(f"Error checking browser storage: {e}")
+            if token:
+                print(f"Found token in {time.perf_counter() - started:.2f}s")
+            return token
+
+    except Exception as e:
+        print(f"Error getting token from browser: {e}")
+        return None
+
+# Zwracane zamiast listy meczów, gdy serwer odpowiedział 304 Not Modified
+NOT_MODIFIED = "NOT_MODIFIED"
+
+def unchanged_for(url, response, seen):
+    """Czy odpowiedź (200 albo 304) ma walidator ``seen`` — ten, z którego powstały wyniki odbiorcy"""
+    if not seen or response.status_code not in (200, 304):
+        return False
+    return http_cache.validator_of(url, response) == seen
+
+def decode_matches(url, response, seen=None):
+    """Zwraca listę meczów z odpowiedzi API albo [] przy błędzie
+
+    NOT_MODIFIED gdy treść ma walidator ``seen`` (zapisany przez odbiorcę razem
+    z jego kalendarzem); przy 304 z innym walidatorem — treść z cache.
+    """
+    if response is None:
+        return []
+    if response.status_code == 304:
+        metrics.incr("http_not_modified")
+    if unchanged_for(url, response, seen):
+        print(f"Not modified: {url}")
+        return NOT_MODIFIED
+    if response.status_code == 304:
+        body = http_cache.load_body(url)
+        if body is None:
+            print(f"304 for {url} but cached body is gone")
             return []
-        
-        print(f"API response status: {response.status_code}")
-        data = response.json()
-        print(f"Found {len(data)} matches in API response")
-        
-        # Konwertuj API response na nasze fixtures
-        fixtures = []
-        for match in data:
-            # Sprawdź czy mecz dotyczy naszej drużyny
-            host_name = match.get("host", {}).get("name", "")
-            guest_name = match.get("guest", {}).get("name", "")
-            
-            if TEAM.lower() not in (host_name.lower() + " " + guest_name.lower()):
-                continue
-                
-            # Parse daty
-            date_time = match.get("dateTime", "")
-            if date_time:
-                try:
-                    # Format: "2025-11-15T00:00:00"
-                    dt = datetime.fromisoformat(date_time.replace("Z", "+00:00"))
-                    date_str = dt.strftime("%d.%m.%Y")
-                    time_str = dt.strftime("%H:%M") if dt.hour != 0 or dt.minute != 0 else None
-                except:
-                    print(f"Error parsing date: {date_time}")
-                    continue
-            else:
-                continue
-                
-            fixture = {
-                "home": host_name,
-                "away": guest_name,
-                "date": date_str,
-                "time": time_str,
-                "stadium": match.get("stadium", ""),
-                "state": match.get("state", ""),
-                "queue": match.get("queue", "")
-            }
-            
-            fixtures.append(fixture)
-            print(f"Found match: {host_name} vs {guest_name} on {date_str} {time_str or 'TBD'}")
-        
-        print(f"Total matches for {TEAM}: {len(fixtures)}")
-        return fixtures
-        
-    except requests.RequestException as e:
-        print(f"API request failed: {e}")
+        metrics.incr("http_cache_hits")
+        data = json.loads(body)
+        print(f"Found {len(data)} matches in {url} (cached)")
+        return data
+    if response.status_code != 200:
+        print(f"API returned status code: {response.status_code} for {url}")
         return []
-    except Exception as e:
+    metrics.incr("bytes_transferred", len(response.content))
+    try:
+        data = response.json()
+    except ValueError as e:
         print(f"Error parsing API response: {e}")
         return []
+    http_cache.store(url, response)
+    print(f"Found {len(data)} matches in {url}")
+    return data
+
+def api_get_many(urls, url_headers=None):
+    """Pobiera równolegle adresy comp-api; zwraca dict url -> Response|None
+
+    Najpierw z tokenem z cache (albo bez tokenu); odpowiedzi 401 są ponawiane
+    raz, z tokenem odświeżonym przez get_token().
+    """
+    from http_fetch import fetch_all
+    urls = list(dict.fromkeys(urls))
+    headers = dict(API_HEADERS)
+
+    # Użyj tokenu z cache, jeśli jest ważny; inaczej spróbuj najpierw bez tokenu
+    with metrics.stage("token"):
+        token = cached_token()
+    if token:
+        metrics.incr("token_cache_hits")
+        headers['Authorization'] = f'Bearer {token}'
+    print(f"Fetching {len(urls)} competition endpoints ({'cached token' if token else 'without authorization token'})...")
+    with metrics.stage("fetch"):
+        responses = fetch_all(urls, headers, url_headers=url_headers)
+
+    unauthorized = [url for url, r in responses.items() if r is not None and r.status_code == 401]
+    if unauthorized:
+        print("401 Unauthorized, getting auth token (browser only if cache is stale)...")
+        with metrics.stage("token"):
+            token = get_token(get_auth_token_from_browser, rejected=token)
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+            print(f"Got token, retrying {len(unauthorized)} requests...")
+            with metrics.stage("fetch"):
+                responses.update(fetch_all(unauthorized, headers, url_headers=url_headers))
+        else:
+            print("Could not get auth token, API requires authentication")
+    return responses
+
+def fetch_matches_many(groups, seen=None, validators=None):
+    """Pobiera równolegle listy meczów wielu grup; zwraca dict group -> lista meczów
+
+    ``seen`` — {grupa: walidator} list, z których odbiorca zbudował swoje wyniki;
+    takie grupy mają wartość NOT_MODIFIED zamiast listy (bez parsowania JSON).
+    Do ``validators`` trafiają walidatory pobranych list — odbiorca zapisuje je
+    dopiero po zapisaniu wyników, które z nich powstały.
+    """
+    seen = seen or {}
+    groups = list(dict.fromkeys(groups))
+    urls = {group: matches_url(group) for group in groups}
+    headers = {url: http_cache.conditional_headers(url) for url in urls.values()}
+    responses = api_get_many(urls.values(), headers)
+
+    results = {}
+    with metrics.stage("decode"):
+        for group, url in urls.items():
+            results[group] = decode_matches(url, responses[url], seen.get(group))
+            validator = results[group] and http_cache.validator_of(url, responses[url])
+            if validators is not None and validator:
+                validators[group] = validator
+    return results
 
-def main():
+def fetch_matches(group):
+    """Pobiera surową listę meczów jednej grupy rozgrywkowej z API"""
+    return fetch_matches_many([group])[group]
+
+def match_to_fixture(match):
+    """Konwertuje mecz z API na nasz fixture (None gdy brak poprawnej daty)"""
+    host_name = match.get("host", {}).get("name", "")
+    guest_name = match.get("guest", {}).get("name", "")
+
+    # Parse daty
+    date_time = match.get("dateTime", "")
+    if not date_time:
+        return None
     try:
+        # Format: "2025-11-15T00:00:00"
+        dt = datetime.fromisoformat(date_time.replace("Z", "+00:00"))
+        date_str = dt.strftime("%d.%m.%Y")
+        time_str = dt.strftime("%H:%M") if dt.hour != 0 or dt.minute != 0 else None
+    except ValueError:
+        print(f"Error parsing date: {date_time}")
+        return None
+
+    return {
+        "id": match.get("id"),
+        "home": host_name,
+        "away": guest_name,
+        "date": date_str,
+        "time": time_str,
+        "stadium": match.get("stadium", ""),
+        "state": match.get("state", ""),
+        "queue": match.get("queue", "")
+    }
+
+def index_matches_by_team(matches):
+    """Buduje indeks: nazwa drużyny (lower) -> lista fixtures z jej udziałem"""
+    index = {}
+    for match in matches:
+        fixture = match_to_fixture(match)
+        if fixture is None:
+            continue
+        for name in {fixture["home"].lower(), fixture["away"].lower()}:
+            if name:
+                index.setdefault(name, []).append(fixture)
+    return index
+
+def fixtures_for_team(index, team):
+    """Zwraca mecze drużyny z indeksu (dokładna nazwa albo dopasowanie z team_match)"""
+    key = team.lower()
+    if key in index:
+        return list(index[key])
+    names = resolve_names(team, index)
+    fixtures, seen = [], set()
+    for name in index:
+        if name not in names:
+            continue
+        for f in index[name]:
+            if id(f) not in seen:
+                seen.add(id(f))
+                fixtures.append(f)
+    return fixtures
+
+def fixtures_for_teams(index, teams):
+    """{drużyna: mecze} dla wielu drużyn jednej grupy (indeks nazw budowany raz)"""
+    return {team: fixtures_for_team(index, team) for team in teams}
+
+def match_chunks(url, response, seen=None):
+    """Kawałki (bytes) treści listy meczów; NOT_MODIFIED albo None jak w decode_matches"""
+    if response.status_code == 304:
+        metrics.incr("http_not_modified")
+    if unchanged_for(url, response, seen):
+        print(f"Not modified: {url}")
+        return NOT_MODIFIED
+    if response.status_code == 304:
+        chunks = http_cache.iter_body(url)
+        if chunks is None:
+            print(f"304 for {url} but cached body is gone")
+        else:
+            metrics.incr("http_cache_hits")
+        return chunks
+    if response.status_code != 200:
+        print(f"API returned status code: {response.status_code} for {url}")
+        return None
+    return http_cache.store_stream(url, response, counted_chunks(response.iter_content(CHUNK_SIZE)))
+
+def counted_chunks(chunks):
+    for chunk in chunks:
+        metrics.incr("bytes_transferred", len(chunk))
+        yield chunk
+
+def resolve_candidates(fixtures, team):
+    """Zawęża mecze kandydatów (z ``matcher``) do drużyn, które wybrałby fixtures_for_team"""
+    names = {f[side].lower() for f in fixtures for side in ("home", "away") if f[side]}
+    chosen = resolve_names(team, names)
+    return [f for f in fixtures if f["home"].lower() in chosen or f["away"].lower() in chosen]
+
+def filter_streamed(matches, team):
+    """(liczba meczów, mecze drużyny) z iteratora meczów API, bez trzymania całej listy"""
+    is_team = matcher(team)
+    fixtures, total = [], 0
+    for match in matches:
+        total += 1
+        fixture = match_to_fixture(match)
+        # W pamięci zostają tylko kandydaci; wybór jak w fixtures_for_team na końcu
+        if fixture and (is_team(fixture["home"]) or is_team(fixture["away"])):
+            fixtures.append(fixture)
+    return total, resolve_candidates(fixtures, team)
+
+def stream_team_fixtures(group, team, seen=None, validators=None):
+    """Mecze drużyny parsowane strumieniowo prosto z gniazda
+
+    Mecze są filtrowane w trakcie czytania odpowiedzi, więc w pamięci
+    zostają tylko mecze drużyny — niezależnie od rozmiaru całej listy.
+    ``seen``/``validators`` jak w fetch_matches_many, dla jednej grupy.
+    """
+    from http_fetch import get_with_retry
+    url = matches_url(group)
+    headers = {**API_HEADERS, **http_cache.conditional_headers(url)}
+    with metrics.stage("token"):
+        token = cached_token()
+    if token:
+        metrics.incr("token_cache_hits")
+        headers['Authorization'] = f'Bearer {token}'
+    print(f"Streaming {url} ({'cached token' if token else 'without authorization token'})...")
+    with metrics.stage("fetch"):
+        response = get_with_retry(url, headers, stream=True)
+    if response is not None and response.status_code == 401:
+        response.close()
+        print("401 Unauthorized, getting auth token (browser only if cache is stale)...")
+        with metrics.stage("token"):
+            token = get_token(get_auth_token_from_browser, rejected=token)
+        if not token:
+            print("Could not get auth token, API requires authentication")
+            return []
+        headers['Authorization'] = f'Bearer {token}'
+        with metrics.stage("fetch"):
+            response = get_with_retry(url, headers, stream=True)
+    if response is None:
+        return []
+
+    with response:
+        chunks = match_chunks(url, response, seen)
+        if chunks is None:
+            return []
+        validator = http_cache.validator_of(url, response)
+        if chunks is NOT_MODIFIED:
+            if validators is not None:
+                validators[group] = validator
+            return NOT_MODIFIED
+        try:
+            # Treść jest czytana z gniazda w trakcie parsowania: "decode" obejmuje też
+            # odbiór treści i filtrowanie po drużynie
+            with metrics.stage("decode", stream=True):
+                total, fixtures = filter_streamed(iter_matches(chunks), team)
+        except (ValueError, OSError) as e:
+            print(f"Error parsing API response: {e}")
+            return []
+    print(f"Streamed {total} matches from {url}")
+    if validators is not None and validator:
+        validators[group] = validator
+    return fixtures
+
+def team_groups(team):
+    """Grupy rozgrywkowe drużyny: z COMPETITION_GROUP/FIXTURES_URL albo z indeksu rozgrywek"""
+    if not GROUP_PINNED:
+        from competition_index import groups_for_team
+        groups = groups_for_team(team)
+        if groups:
+            print(f"Competition index: {team} plays in {len(groups)} group(s)")
+            return groups
+    return [GROUP]
+
+def scrape_fixtures_with_api(group=None, team=None, seen=None, stream=STREAM_MATCHES, groups=None, store=None,
+                             validators=None):
+    """Scrapuje mecze używając API endpoint
+
+    Ze ``stream=True`` odpowiedź jest parsowana przyrostowo (stream_team_fixtures).
+    Bez ``group``/``groups`` grupy drużyny wskazuje team_groups(); mecze z kilku
+    grup są łączone. Z ``store`` (fixture_store.FixtureStore) pobrane mecze grup
+    są zapisywane w historii. NOT_MODIFIED gdy wszystkie grupy mają walidatory
+    z ``seen``; ``validators`` jak w fetch_matches_many.
+    """
+    print("Using API endpoint for scraping...")
+    team = team or TEAM
+    groups = groups or ([group] if group else team_groups(team))
+    seen = seen or {}
+
+    if stream:
+        by_group = {g: stream_team_fixtures(g, team, seen.get(g), validators) for g in groups}
+        unchanged = [g for g in groups if by_group[g] is NOT_MODIFIED]
+        if len(unchanged) == len(groups):
+            return NOT_MODIFIED
+        # Połączony kalendarz potrzebuje też grup bez zmian (304 -> treść z cache)
+        for g in unchanged:
+            by_group[g] = stream_team_fixtures(g, team)
+        fixtures = []
+        for g in groups:
+            if store and by_group[g]:
+                store.ingest(g, by_group[g], team=team)
+            fixtures += by_group[g]
+        print(f"Total matches for {team}: {len(fixtures)}")
+        return fixtures
+
+    by_group = fetch_matches_many(groups, seen, validators)
+    unchanged = [g for g in groups if by_group[g] is NOT_MODIFIED]
+    if len(unchanged) == len(groups):
+        return NOT_MODIFIED
+    if unchanged:
+        by_group.update(fetch_matches_many(unchanged))
+    if store:
+        for g in groups:
+            if by_group[g]:
+                store.ingest(g, [f for f in map(match_to_fixture, by_group[g]) if f])
+    matches = [m for g in groups for m in by_group[g]]
+    with metrics.stage("filter"):
+        index = index_matches_by_team(matches)
+        fixtures = fixtures_for_team(index, team)
+    for f in fixtures:
+        print(f"Found match: {f['home']} vs {f['away']} on {f['date']} {f['time'] or 'TBD'}")
+
+    print(f"Total matches for {team}: {len(fixtures)}")
+    return fixtures
+
+def write_calendar(fixtures, out, team=None):
+    """Aktualizuje kalendarz, serializując tylko dodane/zmienione mecze"""
+    from fixture_state import update_calendar
+    added, changed, removed = update_calendar(fixtures, out, team or TEAM)
+    print(f"{out}: {len(added)} added, {len(changed)} changed, {len(removed)} removed")
+    return bool(added or changed or removed)
+
+def load_run_state(path=STATE_FILE):
+    """(hash, {grupa: walidator}) kalendarza OUT; STATE_FILE: hash, w drugiej linii walidatory (JSON)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return "", {}
+    try:
+        validators = json.loads(lines[1]) if len(lines) > 1 else {}
+    except ValueError:
+        validators = {}
+    return (lines[0].strip() if lines else ""), validators
+
+def run_state_text(h, validators):
+    return f"{h}\n{json.dumps(validators, sort_keys=True)}\n"
+
+def seen_validators(out=OUT, path=STATE_FILE):
+    """Walidatory list meczów, z których powstał istniejący kalendarz ``out``"""
+    return load_run_state(path)[1] if os.path.exists(out) else {}
+
+def check_changes(stream=STREAM_MATCHES):
+    """Tylko pobranie i porównanie hasha — niczego nie zapisuje
+
+    Ani ICS, ani stanu, ani cache odpowiedzi HTTP: nowe walidatory w cache
+    sprawiłyby, że generowanie po sprawdzeniu dostałoby 304 i zgubiło zmianę.
+    Zwraca kod wyjścia: 0 — bez zmian, 2 — są zmiany, 1 — brak meczów.
+    """
+    with http_cache.read_only():
+        fixtures = scrape_fixtures_with_api(seen=seen_validators(), stream=stream)
+    if fixtures is NOT_MODIFIED:
+        print("NO_CHANGE")
+        return 0
+    if not fixtures:
+        print(f"WARNING: No fixtures found for {TEAM}")
+        return 1
+    if compute_hash(fixtures) == load_run_state()[0]:
+        print("NO_CHANGE")
+        return 0
+    print("CHANGED")
+    return 2
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generuje kalendarz ICS z meczami drużyny")
+    parser.add_argument("--batch", metavar="CONFIG",
+                        help="plik JSON z listą drużyn (tryb wsadowy, patrz teams.example.json)")
+    parser.add_argument("--schedule", action="store_true",
+                        help="tryb rezydentny: odpytuje ligi w pętli z adaptacyjnym okresem (z --batch: wszystkie drużyny z pliku)")
+    parser.add_argument("--serve", action="store_true",
+                        help="serwer HTTP z kalendarzami renderowanymi na żądanie (z --batch: grupy z pliku)")
+    parser.add_argument("--check-only", action="store_true",
+                        help="tylko pobiera mecze i porównuje hash: kod 0 bez zmian, 2 gdy są zmiany")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="dopisuje czasy etapów i liczniki jako JSON lines (domyślnie METRICS_FILE)")
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="zapisuje metryki w formacie tekstowym Prometheusa (domyślnie METRICS_PROM_FILE)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="uruchamia przebieg pod cProfile i zapisuje statystyki (pstats) do FILE")
+    parser.add_argument("--cache-info", action="store_true",
+                        help="wypisuje zawartość cache odpowiedzi HTTP i kończy")
+    parser.add_argument("--stream", action="store_true", default=STREAM_MATCHES,
+                        help="parsuje listę meczów strumieniowo (stała pamięć przy dużych ligach)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics.configure(args.metrics, args.prometheus)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to {args.profile} (python -m pstats {args.profile})")
+        metrics.flush(team=TEAM)
+
+def run(args):
+    try:
+        if args.cache_info:
+            http_cache.print_info()
+            return
+
+        if args.check_only:
+            exit(check_changes(args.stream))
+
+        if args.serve:
+            from ics_server import run_server
+            run_server(args.batch)
+            return
+
+        if args.schedule:
+            from scheduler import run_scheduler
+            run_scheduler(args.batch)
+            return
+
+        if args.batch:
+            from batch import run_batch
+            run_batch(args.batch)
+            return
+
         print(f"Starting scraper for: {TEAM}")
         print(f"URL: {URL}")
         
-        # Spróbuj zescrapować prawdziwe mecze z API
-        print("Attempting to scrape real fixtures from API...")
-        fixtures = scrape_fixtures_with_api()
-        
-        print(f"Found {len(fixtures)} fixtures for {TEAM}")
-        
+        # Źródła po kolei: API, wyrenderowana strona, ostatnie znane dane (sources.py)
+        print("Fetching fixtures (source chain)...")
+        # NOT_MODIFIED tylko wobec list, z których powstał istniejący kalendarz
+        from sources import fetch_fixtures
+        validators = {}
+        source, fixtures = fetch_fixtures(TEAM, team_groups(TEAM), seen=seen_validators(), stream=args.stream,
+                                          validators=validators)
+        if fixtures is NOT_MODIFIED:
+            print("NO_CHANGE")
+            return
+
         if not fixtures:
-            print("WARNING: No fixtures found. Creating test data...")
-            # Fallback do testowych danych
-            today = datetime.now()
-            fixtures = [{
-                "home": "KS Wasilków",
-                "away": "Test Team",
-                "date": today.strftime("%d.%m.%Y"),
-                "time": "15:00"
-            }]
-        
+            # Lepiej zostawić poprzedni kalendarz niż nadpisać go pustym albo zmyślonym
+            print(f"ERROR: No fixtures found for {TEAM} in any source, {OUT} left unchanged")
+            exit(1)
+        print(f"Found {len(fixtures)} fixtures for {TEAM} (source: {source})")
+
         h = compute_hash(fixtures)
-        old = open(STATE_FILE).read().strip() if os.path.exists(STATE_FILE) else ""
-        
-        if h != old:
-            print("Changes detected, generating ICS...")
-            cal = build_ics(fixtures)
-            with open(OUT, "w", encoding="utf-8") as f:
-                f.writelines(cal.serialize_iter())
-            with open(STATE_FILE, "w", encoding="utf-8") as s:
-                s.write(h)
-            print("UPDATED")
-            print(f"Created {OUT} with {len(fixtures)} fixtures")
-        else:
-            print("NO_CHANGE")
+        from atomic_output import locked, write_atomic
+        # Kalendarz i STATE_FILE zmieniają się razem: drugi przebieg czeka na blokadę.
+        # Walidatory trafiają do stanu dopiero po zapisaniu kalendarza
+        with locked(OUT):
+            if h != load_run_state()[0]:
+                print("Changes detected, generating ICS...")
+                write_calendar(fixtures, OUT)
+                print("UPDATED")
+                print(f"Created {OUT} with {len(fixtures)} fixtures")
+            else:
+                print("NO_CHANGE")
+            write_atomic(STATE_FILE, run_state_text(h, validators))
             
     except Exception as e:
         print(f"ERROR: {str(e)}")
@@ -0,0 +1,218 @@
+"""Źródła meczów z łańcuchem awaryjnym, budżetami czasu i bezpiecznikami.
+
+Źródła (``SOURCE_CHAIN``, domyślnie ``api,html,cache``) są próbowane po kolei:
+- ``api`` — comp-api (scrape_fixtures_with_api, z zapisem do historii meczów),
+- ``html`` — strona rozgrywek wyrenderowana w przeglądarce i parse_fixture_rows;
+  przeglądarka jest wypożyczana z browser_pool (ciepła, współdzielona z tokenem),
+  a wiersze dostają id i pozostałe pola z historii (te same UID co z API),
+- ``cache`` — ostatnie znane dobre dane: bieżące mecze drużyny z fixture_store.
+
+Każde źródło ma budżet czasu (``SOURCE_BUDGET_<NAZWA>``), a cały łańcuch —
+``SOURCE_DEADLINE``; źródło, które nie zmieści się w budżecie, jest porzucane.
+Po ``BREAKER_FAILURES`` kolejnych porażkach bezpiecznik źródła otwiera się na
+``BREAKER_COOLDOWN`` sekund i źródło jest pomijane od razu; po tym czasie
+dostaje jedną próbę. Stan bezpieczników jest w ``BREAKER_FILE``, więc działa
+także między osobnymi uruchomieniami z crona.
+"""
+
+import json, os, threading, time
+
+import metrics
+from atomic_output import write_atomic
+from scrape_to_ics import (
+    GROUP, NOT_MODIFIED, URL, group_from_url, parse_fixture_rows,
+    scrape_fixtures_with_api,
+)
+
+SOURCE_CHAIN = os.environ.get("SOURCE_CHAIN", "api,html,cache")
+# Cały łańcuch musi się zmieścić w limicie zadania CI (10 min) razem z instalacją zależności
+SOURCE_DEADLINE = float(os.environ.get("SOURCE_DEADLINE", "300"))
+BREAKER_FILE = os.environ.get("BREAKER_FILE", ".source_breakers.json")
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", "1800"))
+HTML_RENDER_TIMEOUT = float(os.environ.get("HTML_RENDER_TIMEOUT", "30"))
+
+class SourceError(Exception):
+    """Źródło nie dało meczów (błąd, brak danych albo przekroczony budżet)"""
+
+def budget_for(name, default):
+    return float(os.environ.get(f"SOURCE_BUDGET_{name.upper()}", str(default)))
+
+class ApiSource:
+    name = "api"
+    budget = budget_for("api", 90)
+
+    def applies(self, groups):
+        return True
+
+    def fetch(self, team, groups, seen=None, stream=False, validators=None):
+        from fixture_store import FixtureStore
+        with FixtureStore() as store:
+            fixtures = scrape_fixtures_with_api(team=team, seen=seen, stream=stream, groups=groups,
+                                                store=store, validators=validators)
+            if fixtures is NOT_MODIFIED:
+                return NOT_MODIFIED
+            if not fixtures:
+                raise SourceError("no fixtures from comp-api")
+            # Kalendarz z historii: bieżące wersje meczów drużyny w jej grupach
+            fixtures = store.fixtures(team, competitions=groups)
+            if not fixtures:
+                raise SourceError("fixture history has no current fixtures for this team")
+            return fixtures
+
+class HtmlSource:
+    name = "html"
+    budget = budget_for("html", 120)
+
+    def applies(self, groups):
+        """Strona z FIXTURES_URL pokazuje jedną grupę — tylko gdy to jedyna grupa drużyny"""
+        return list(groups) == [group_from_url(URL)]
+
+    def fetch(self, team, groups, seen=None, stream=False, validators=None):
+        import browser_pool
+        from fixture_store import FixtureStore
+        # Strona ładuje mecze skryptem; czekamy, aż pojawią się wiersze drużyny
+        fixtures = browser_pool.render_page(URL, lambda html: parse_fixture_rows(html, team),
+                                            timeout=HTML_RENDER_TIMEOUT)
+        if not fixtures:
+            raise SourceError(f"no fixtures rendered within {HTML_RENDER_TIMEOUT:.0f}s")
+        with FixtureStore() as store:
+            fixtures = with_stored_identity(fixtures, store.fixtures(team, competitions=groups))
+            store.ingest(groups[0], fixtures, team=team)
+        return fixtures
+
+def with_stored_identity(fixtures, stored):
+    """Wiersze HTML uzupełnione o id i pozostałe pola odpowiadających im meczów z historii
+
+    HTML nie ma id meczu, więc bez tego fixture_key dawałby inne klucze (i UID)
+    niż API, a każde przełączenie źródła usuwałoby i dodawało wszystkie
+    wydarzenia. Para gospodarz/gość z datą, a bez niej — jedyny mecz tej pary
+    (przełożony termin). Pola ze strony mają pierwszeństwo.
+    """
+    by_date, by_pair = {}, {}
+    for fix in stored:
+        pair = (fix["home"].lower(), fix["away"].lower())
+        by_date[pair + (fix["date"],)] = fix
+        by_pair.setdefault(pair, []).append(fix)
+    out = []
+    for fix in fixtures:
+        pair = (fix["home"].lower(), fix["away"].lower())
+        match = by_date.get(pair + (fix["date"],))
+        if match is None and len(by_pair.get(pair, ())) == 1:
+            match = by_pair[pair][0]
+        out.append({**match, **fix} if match else fix)
+    return out
+
+class CacheSource:
+    name = "cache"
+    budget = budget_for("cache", 10)
+
+    def applies(self, groups):
+        return True
+
+    def fetch(self, team, groups, seen=None, stream=False, validators=None):
+        from fixture_store import FIXTURE_DB, FixtureStore
+        if not os.path.exists(FIXTURE_DB):
+            raise SourceError("no fixture history yet")
+        with FixtureStore() as store:
+            fixtures = store.fixtures(team, competitions=groups)
+        if not fixtures:
+            raise SourceError("no stored fixtures for this team")
+        print(f"Using last known fixtures from {FIXTURE_DB}")
+        return fixtures
+
+SOURCES = {source.name: source for source in (ApiSource, HtmlSource, CacheSource)}
+
+def load_breakers(path=BREAKER_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_breakers(breakers, path=BREAKER_FILE):
+    write_atomic(path, json.dumps(breakers, indent=1, sort_keys=True))
+
+def breaker_allows(breaker, now):
+    """Zamknięty bezpiecznik albo otwarty dłużej niż BREAKER_COOLDOWN (jedna próba)"""
+    opened = breaker.get("opened_at")
+    return opened is None or now - opened >= BREAKER_COOLDOWN
+
+def record_result(breaker, ok, now):
+    if ok:
+        breaker.clear()
+        return
+    breaker["failures"] = breaker.get("failures", 0) + 1
+    if breaker["failures"] >= BREAKER_FAILURES:
+        breaker["opened_at"] = now
+
+def call_with_budget(fn, budget):
+    """Wynik ``fn()`` albo SourceError po ``budget`` sekundach
+
+    Porzucony wątek jest demonem: dokończy się w tle albo zniknie z procesem.
+    """
+    result = {}
+
+    def target():
+        try:
+            result["value"] = fn()
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(budget)
+    if thread.is_alive():
+        raise SourceError(f"over budget ({budget:.0f}s)")
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+def source_chain(names=SOURCE_CHAIN):
+    return [SOURCES[name.strip()]() for name in names.split(",") if name.strip()]
+
+def fetch_fixtures(team, groups=None, seen=None, stream=False, chain=None, breaker_path=BREAKER_FILE,
+                   validators=None):
+    """(nazwa źródła, mecze albo NOT_MODIFIED) z pierwszego źródła, które dało mecze
+
+    ``seen``/``validators`` — walidatory list meczów (scrape_fixtures_with_api);
+    do ``validators`` trafiają tylko te od źródła, które dało wynik.
+    Zwraca (None, []) gdy żadne źródło nie dało meczów w czasie SOURCE_DEADLINE.
+    """
+    groups = groups or [GROUP]
+    breakers = load_breakers(breaker_path)
+    deadline = time.monotonic() + SOURCE_DEADLINE
+    try:
+        for source in chain if chain is not None else source_chain():
+            if not source.applies(groups):
+                print(f"Source {source.name}: not applicable to groups {', '.join(groups)}")
+                continue
+            breaker = breakers.setdefault(source.name, {})
+            now = time.time()
+            if not breaker_allows(breaker, now):
+                print(f"Source {source.name}: circuit open, skipping")
+                metrics.incr("source_skipped")
+                continue
+            budget = min(source.budget, deadline - time.monotonic())
+            if budget <= 0:
+                print(f"Source deadline ({SOURCE_DEADLINE:.0f}s) reached")
+                break
+            print(f"Source {source.name} (budget {budget:.0f}s)...")
+            # Porzucony (po budżecie) wątek źródła nie może dopisać walidatorów wynikowi innego
+            found = {}
+            try:
+                with metrics.stage("source", source=source.name):
+                    fixtures = call_with_budget(
+                        lambda: source.fetch(team, groups, seen, stream, found), budget)
+            except Exception as e:
+                record_result(breaker, False, time.time())
+                metrics.incr("source_failures")
+                print(f"Source {source.name} failed: {e}")
+                continue
+            record_result(breaker, True, time.time())
+            if validators is not None:
+                validators.update(found)
+            return source.name, fixtures
+    finally:
+        save_breakers(breakers, breaker_path)
+    return None, []
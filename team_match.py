@@ -0,0 +1,172 @@
+"""Dopasowanie nazw drużyn: normalizacja, aliasy i indeks trigramów.
+
+Nazwa jest sprowadzana do klucza: bez znaków diakrytycznych ("Wasilków" ->
+"wasilkow"), bez interpunkcji i bez słów formy klubu (KS, MKS, GKS, ...).
+Oznaczenia drużyn rezerwowych i młodzieżowych (II, III, U19, ...) zostają
+osobno i muszą się zgadzać, więc "KS Wasilków" nie łapie "KS Wasilków II".
+Aliasy z ``TEAM_ALIASES_FILE`` ({"nazwa": ["alias", ...]}) sprowadzają różne
+zapisy do jednego klucza.
+
+``TeamIndex`` buduje się raz na zbiór nazw (grupę rozgrywkową): dokładny klucz
+to jedno wyszukanie w słowniku, a gdy go nie ma — kandydaci z odwróconego
+indeksu trigramów, oceniani podobieństwem, bez przeglądania wszystkich meczów.
+"""
+
+import json, os, re, unicodedata
+from collections import Counter
+from functools import lru_cache
+
+TEAM_ALIASES_FILE = os.environ.get("TEAM_ALIASES_FILE", "team_aliases.json")
+# Minimalne podobieństwo (0..1) dopasowania przybliżonego
+TEAM_MATCH_THRESHOLD = float(os.environ.get("TEAM_MATCH_THRESHOLD", "0.75"))
+# Ile wyników ``lookup`` pamięta jeden indeks (szukane nazwy mogą pochodzić z żądań HTTP)
+TEAM_LOOKUP_CACHE = int(os.environ.get("TEAM_LOOKUP_CACHE", "1024"))
+
+# Litery, których NFKD nie rozkłada na literę bazową + znak diakrytyczny
+FOLD = str.maketrans({"ł": "l", "Ł": "L", "ø": "o", "Ø": "O", "đ": "d", "Đ": "D", "ß": "ss"})
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+# Skróty formy prawnej i typu klubu — nie odróżniają drużyn
+CLUB_WORDS = {
+    "ks", "mks", "gks", "lks", "uks", "mlks", "glks", "zks", "sks", "kks", "tks", "mgks",
+    "kp", "fc", "sp", "ts", "klub", "sportowy", "sportowe", "stowarzyszenie", "sa", "z", "o", "oo",
+}
+# Oznaczenia drużyn rezerwowych i młodzieżowych — muszą się zgadzać
+SQUAD_RE = re.compile(r"^(ii|iii|iv|v|u\d{1,2}|rez|rezerwy|junior|juniorzy)$")
+
+def fold(name):
+    """Małe litery bez znaków diakrytycznych i interpunkcji, pojedyncze spacje"""
+    decomposed = unicodedata.normalize("NFKD", name.translate(FOLD))
+    ascii_only = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_ALNUM_RE.sub(" ", ascii_only.lower()).strip()
+
+def split_key(name):
+    """(rdzeń nazwy, oznaczenie składu): "MKS Wasilków II" -> ("wasilkow", "ii")"""
+    words = fold(name).split()
+    squad = [w for w in words if SQUAD_RE.match(w)]
+    core = [w for w in words if w not in CLUB_WORDS and not SQUAD_RE.match(w)]
+    # Nazwa złożona z samych skrótów ("KS") zostaje jak jest
+    return " ".join(core or words), " ".join(sorted(squad))
+
+def name_key(name, aliases=None):
+    """Klucz porównania nazwy (z uwzględnieniem aliasów)"""
+    key = split_key(name)
+    return aliases.get(key, key) if aliases else key
+
+def trigrams(core):
+    padded = f"  {core} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def load_aliases(path=TEAM_ALIASES_FILE):
+    """{klucz aliasu: klucz nazwy kanonicznej} z pliku JSON; brak pliku = brak aliasów"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    aliases = {}
+    for canonical, variants in raw.items():
+        for variant in variants:
+            aliases[split_key(variant)] = split_key(canonical)
+    return aliases
+
+@lru_cache(maxsize=1)
+def default_aliases():
+    return load_aliases()
+
+def similarity(grams, other):
+    """Większa z miar: Dice i pokrycie szukanej nazwy (fragment nazwy to pełne dopasowanie)"""
+    shared = len(grams & other)
+    return max(2 * shared / (len(grams) + len(other)), shared / len(grams))
+
+class TeamIndex:
+    """Indeks nazw drużyn jednej grupy: ``lookup(team)`` -> zbiór pasujących nazw"""
+
+    def __init__(self, names, aliases=None, threshold=TEAM_MATCH_THRESHOLD, cache_size=TEAM_LOOKUP_CACHE):
+        self.aliases = default_aliases() if aliases is None else aliases
+        self.threshold = threshold
+        self.by_key = {}   # klucz -> nazwy
+        self.grams = {}    # trigram -> klucze
+        self.key_grams = {}
+        self._cached = lru_cache(maxsize=cache_size)(self._lookup_frozen)
+        for name in names:
+            if not name:
+                continue
+            key = name_key(name, self.aliases)
+            self.by_key.setdefault(key, set()).add(name)
+            if key not in self.key_grams:
+                self.key_grams[key] = trigrams(key[0])
+                for gram in self.key_grams[key]:
+                    self.grams.setdefault(gram, set()).add(key)
+
+    def lookup(self, team):
+        """Nazwy pasujące do ``team``: ten sam klucz, a bez niego najlepsi kandydaci z trigramów"""
+        return self._cached(team)
+
+    def _lookup_frozen(self, team):
+        return frozenset(self._lookup(team))
+
+    def _lookup(self, team):
+        key = name_key(team, self.aliases)
+        if key in self.by_key:
+            return self.by_key[key]
+        grams = trigrams(key[0])
+        shared = Counter(k for gram in grams for k in self.grams.get(gram, ()) if k[1] == key[1])
+        scored = [(similarity(grams, self.key_grams[k]), k) for k in shared]
+        best = max((score for score, _ in scored), default=0)
+        if best < self.threshold:
+            return set()
+        return set().union(*(self.by_key[k] for score, k in scored if score == best))
+
+    def match_many(self, teams):
+        """{drużyna: nazwy} dla wielu szukanych drużyn naraz"""
+        return {team: self.lookup(team) for team in teams}
+
+@lru_cache(maxsize=256)
+def index_for(names):
+    """TeamIndex dla zbioru nazw (frozenset), zapamiętany — budowany raz na grupę"""
+    return TeamIndex(names)
+
+@lru_cache(maxsize=256)
+def matcher(team):
+    """Predykat kandydata nazwa -> bool dla nazw przychodzących pojedynczo (strumień, HTML)
+
+    Przepuszcza każdą nazwę, którą ``TeamIndex.lookup`` mógłby wybrać (ten sam
+    klucz albo podobieństwo >= TEAM_MATCH_THRESHOLD). Ostateczny wybór —
+    dokładny klucz, jeśli jest, a bez niego najlepszy wynik — robi się po
+    zebraniu kandydatów (``resolve_names``), tak jak dla całej listy naraz.
+    Wynik dla każdej nazwy jest zapamiętany.
+    """
+    aliases = default_aliases()
+    key = name_key(team, aliases)
+    grams = trigrams(key[0])
+    seen = {}
+
+    def matches(name):
+        if name not in seen:
+            other = name_key(name, aliases)
+            seen[name] = bool(name) and (other == key or (
+                other[1] == key[1] and similarity(grams, trigrams(other[0])) >= TEAM_MATCH_THRESHOLD))
+        return seen[name]
+    return matches
+
+def resolve_names(team, names):
+    """Nazwy (lower) drużyny ``team`` spośród ``names`` (lower)
+
+    Dokładna nazwa, gdy występuje; inaczej ``TeamIndex.lookup`` (ten sam
+    klucz, a bez niego najlepsze dopasowanie).
+    """
+    key = team.lower()
+    if key in names:
+        return {key}
+    return index_for(frozenset(names)).lookup(team)
+
+@lru_cache(maxsize=8192)
+def closeness(team, name):
+    """(ten sam klucz, podobieństwo) — porządek do wyboru, która strona meczu to ``team``"""
+    aliases = default_aliases()
+    key, other = name_key(team, aliases), name_key(name, aliases)
+    if key == other:
+        return True, 1.0
+    if not name or key[1] != other[1]:
+        return False, 0.0
+    return False, similarity(trigrams(key[0]), trigrams(other[0]))
@@ -0,0 +1,93 @@
+"""Trwały cache tokenu autoryzacyjnego comp-api.
+
+Token jest trzymany w pliku JSON razem z czasem wygaśnięcia (claim ``exp``
+z JWT, a gdy go brak — ``TOKEN_TTL``). Odświeżenie odbywa się pod blokadą
+pliku, więc równoległe procesy uruchamiają przeglądarkę najwyżej raz.
+"""
+
+import base64, fcntl, json, os, time
+from contextlib import contextmanager
+
+TOKEN_CACHE_FILE = os.environ.get("TOKEN_CACHE_FILE", ".token_cache.json")
+TOKEN_TTL = int(os.environ.get("TOKEN_TTL", "3600"))
+# Odśwież token zawczasu, zanim faktycznie wygaśnie
+REFRESH_MARGIN = int(os.environ.get("TOKEN_REFRESH_MARGIN", "300"))
+
+def jwt_expiry(token):
+    """Zwraca claim ``exp`` z JWT (epoch) albo None, gdy token nie jest JWT"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def strip_bearer(token):
+    return token[7:] if token.lower().startswith("bearer ") else token
+
+def read_cache(path=TOKEN_CACHE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        return entry if entry.get("token") else None
+    except (OSError, ValueError):
+        return None
+
+def write_cache(token, path=TOKEN_CACHE_FILE):
+    now = time.time()
+    entry = {
+        "token": token,
+        "fetched_at": now,
+        "expires_at": jwt_expiry(token) or now + TOKEN_TTL,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, path)
+    return entry
+
+def is_fresh(entry, margin=REFRESH_MARGIN):
+    return entry is not None and entry["expires_at"] - margin > time.time()
+
+@contextmanager
+def locked(path=TOKEN_CACHE_FILE):
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def cached_token(path=TOKEN_CACHE_FILE):
+    """Zwraca ważny token z cache bez uruchamiania przeglądarki (albo None)"""
+    entry = read_cache(path)
+    return entry["token"] if is_fresh(entry) else None
+
+def get_token(refresh, rejected=None, path=TOKEN_CACHE_FILE):
+    """Zwraca ważny token; ``refresh()`` jest wołane tylko gdy cache nie wystarcza.
+
+    ``rejected`` to token, który serwer właśnie odrzucił (401) — nie zostanie
+    zwrócony ponownie, nawet jeśli według ``exp`` jest jeszcze ważny.
+    """
+    entry = read_cache(path)
+    if is_fresh(entry) and entry["token"] != rejected:
+        return entry["token"]
+
+    with locked(path):
+        # Inny proces mógł odświeżyć token, gdy czekaliśmy na blokadę
+        entry = read_cache(path)
+        if is_fresh(entry) and entry["token"] != rejected:
+            return entry["token"]
+
+        token = refresh()
+        if not token:
+            return None
+        token = strip_bearer(token)
+        entry = write_cache(token, path)
+        left = entry["expires_at"] - time.time()
+        print(f"Cached new auth token (valid for {left / 60:.0f} min)")
+        return token